@@ -0,0 +1,188 @@
+# prices a market option chain with the binomial options pricing model and
+# writes the results in the layout of the data/spy_03-15-2019_bopm_*.csv files.
+# the input file is streamed in chunks, each chunk is priced with one call to
+# bopm.option_chain_price per vol column and appended to the output file, so
+# memory stays flat no matter how many contracts the chain has.
+#
+# Changelog:
+#
+# 10-17-2026
+#
+# initial creation. reads a chain with <type>_strike and (optionally)
+# <type>_vol columns, and writes <type>_strike, bopm_<type>_ivol (priced with
+# the per-contract vol) and bopm_<type>_hvol (priced with a single historical
+# vol). reports progress and throughput to stderr. -T may be fractional, as
+# long as it is a whole number of time steps.
+
+# program name
+PROGNAME = "bopm_chain"
+
+# help flag
+HELP_FLAG = "--help"
+
+# force tree flag; prices calls with the tree even if there is a closed form
+TREE_FLAG = "--tree"
+
+# flags that take arguments
+S_FLAG = "-S"
+R_FLAG = "-r"
+T_FLAG = "-T"
+Q_FLAG = "-q"
+DDT_FLAG = "-dt"
+TYPE_FLAG = "-t"
+FLAVOR_FLAG = "-f"
+HV_FLAG = "-hv"
+CS_FLAG = "-cs"
+
+# csv extension
+CSV_EXT = ".csv"
+
+# help string
+HELP_STR = """Usage: {0} in_file{1} out_file{1} [ flag=value ... ] [ {2} ]
+       {0} [ {3} ]
+prices each contract of an option chain in in_file with the binomial options
+pricing model, and writes the prices to out_file. in_file must have a column
+named <type>_strike, and may have a column <type>_vol of per-contract implied
+vols, where <type> is the option type (call or put). out_file will have the
+columns <type>_strike, bopm_<type>_ivol (only if in_file has the vol column)
+and bopm_<type>_hvol, priced with the historical vol given by {4}. in_file is
+read and priced in chunks, and progress is printed to stderr.
+
+flags:
+
+{5}\tprice of the underlying, default 263.63
+{6}\tconstant risk free rate, default 0.03
+{7}\tmonths until expiration (30/360), default 3
+{8}\tconstant dividend yield, default 0
+{9}\ttime steps per day, default 1
+{10}\toption type, call or put, default call
+{11}\toption flavor, american or european, default american
+{4}\thistorical vol used for bopm_<type>_hvol, default 0.22
+{12}\tnumber of contracts per chunk, default 1000
+{2}\talways price with the tree, even when a closed form exists
+{3}\tprints this usage""".format(PROGNAME, CSV_EXT, TREE_FLAG, HELP_FLAG,
+                               HV_FLAG, S_FLAG, R_FLAG, T_FLAG, Q_FLAG,
+                               DDT_FLAG, TYPE_FLAG, FLAVOR_FLAG, CS_FLAG)
+
+# default parameters; see notes in options/spy_03-15-2019_bopm.xyc
+PARAMS = {S_FLAG: 263.63, R_FLAG: 0.03, T_FLAG: 3, Q_FLAG: 0, DDT_FLAG: 1,
+          TYPE_FLAG: "call", FLAVOR_FLAG: "american", HV_FLAG: 0.22,
+          CS_FLAG: 1000}
+
+# flags whose values are strings; the rest are numeric
+STR_FLAGS = [TYPE_FLAG, FLAVOR_FLAG]
+
+# flags whose values must be ints. months until expiration may be fractional;
+# bopm checks that they come to a whole number of time steps
+INT_FLAGS = [DDT_FLAG, CS_FLAG]
+
+# import sys and time
+import sys
+import time
+# import pandas
+import pandas as pd
+# import bopm
+import options.bopm as bopm
+
+def price_chain(in_file, out_file, S_, r, T_, q, d_dt, is_type, flavor, hvol,
+                chunk_size, analytic = True):
+    """
+    streams in_file in chunks of chunk_size contracts, prices each chunk and
+    appends it to out_file. prints progress and throughput to stderr. returns
+    the total number of contracts priced.
+    """
+    # column names
+    strike_col = "{0}_strike".format(is_type)
+    vol_col = "{0}_vol".format(is_type)
+    # number of contracts priced so far
+    count = 0
+    start = time.time()
+    for i, chunk in enumerate(pd.read_csv(in_file, chunksize = chunk_size)):
+        # strike column is required
+        if (strike_col not in chunk.columns):
+            print("{0}: error: column {1} not in file {2}.".format(
+                PROGNAME, strike_col, in_file))
+            quit(1)
+        K = chunk[strike_col].values
+        out = pd.DataFrame({strike_col: K})
+        # implied vol prices; per-contract vols change every chunk, so don't
+        # let them fill up the lattice cache
+        if (vol_col in chunk.columns):
+            out["bopm_{0}_ivol".format(is_type)] = bopm.option_chain_price(
+                S_, chunk[vol_col].values, r, K, T_, q = q, d_dt = d_dt,
+                is_type = is_type, flavor = flavor, cache = False,
+                analytic = analytic)
+        # historical vol prices
+        out["bopm_{0}_hvol".format(is_type)] = bopm.option_chain_price(
+            S_, hvol, r, K, T_, q = q, d_dt = d_dt, is_type = is_type,
+            flavor = flavor, analytic = analytic)
+        # write header with the first chunk only, then append
+        out.to_csv(out_file, mode = "w" if i == 0 else "a", header = (i == 0),
+                   index = False)
+        count += K.size
+        elapsed = time.time() - start
+        print("{0}: {1} contracts priced ({2:.1f} contracts/sec)".format(
+            PROGNAME, count, count / elapsed if elapsed > 0 else float("inf")),
+              file = sys.stderr)
+    return count
+
+# main
+if (__name__ == "__main__"):
+    # get length of arguments in the argv vector
+    argc = len(sys.argv)
+    # if there is one argument and it is the help option, print usage and exit
+    if (argc == 2 and sys.argv[1] == HELP_FLAG):
+        print(HELP_STR)
+        quit()
+    # else need at least input and output files
+    if (argc < 3):
+        print("{0}: error: input and output files required. type '{0} {1}' "
+              "for usage.".format(PROGNAME, HELP_FLAG))
+        quit(1)
+    in_file, out_file = sys.argv[1], sys.argv[2]
+    # both files must be csv files
+    if (CSV_EXT not in in_file or CSV_EXT not in out_file):
+        print("{0}: error: input and output files must be {1} files.".format(
+            PROGNAME, CSV_EXT))
+        quit(1)
+    # use closed form prices where available unless TREE_FLAG is passed
+    analytic = True
+    # parse the remaining flags
+    for arg in sys.argv[3:]:
+        # if it is the tree flag
+        if (arg == TREE_FLAG):
+            analytic = False
+            continue
+        # attempt to split arg by "="
+        s_arg = arg.split("=")
+        # if not of form flag=value or unknown flag, print error and exit
+        if (len(s_arg) != 2 or s_arg[0] not in PARAMS):
+            print("{0}: error: unknown flag '{1}'. type '{0} {2}' for usage."
+                  "".format(PROGNAME, arg, HELP_FLAG))
+            quit(1)
+        flag, val = s_arg
+        # string values are used as is
+        if (flag in STR_FLAGS):
+            PARAMS[flag] = val
+            continue
+        # else attempt to cast to int or float; print error and exit on failure
+        try:
+            PARAMS[flag] = int(val) if flag in INT_FLAGS else float(val)
+        except ValueError:
+            print("{0}: error: argument to {1} expected to be {2}.".format(
+                PROGNAME, flag, "int" if flag in INT_FLAGS else "float"))
+            quit(1)
+    # chunk size must be positive
+    if (PARAMS[CS_FLAG] < 1):
+        print("{0}: error: argument to {1} must be positive.".format(
+            PROGNAME, CS_FLAG))
+        quit(1)
+    # price the chain; bopm raises ValueError on invalid parameters
+    try:
+        price_chain(in_file, out_file, PARAMS[S_FLAG], PARAMS[R_FLAG],
+                    PARAMS[T_FLAG], PARAMS[Q_FLAG], PARAMS[DDT_FLAG],
+                    PARAMS[TYPE_FLAG], PARAMS[FLAVOR_FLAG], PARAMS[HV_FLAG],
+                    PARAMS[CS_FLAG], analytic = analytic)
+    except ValueError as e:
+        print("{0}: {1}".format(PROGNAME, e))
+        quit(1)
@@ -6,6 +6,14 @@ in the future.
 """
 # Changelog:
 #
+# 10-17-2026
+#
+# vectorized log(): each column is transformed with numpy masks instead of a
+# loop over its elements, with the same results (0 becomes -inf, negative
+# values become NaN). warnings are now one summary line per column, with the
+# number of NaN, 0 and negative values and the first few offending rows (see
+# the new warn_rows parameter), written by the new function _dfcolwarn().
+#
 # 01-03-2019
 #
 # separated module description from change log and made module description a
@@ -39,9 +47,28 @@ _LIBNAME = "data_transform"
 
 # function names
 _DFVALWARN_N = "_dfvalwarn"
+_DFCOLWARN_N = "_dfcolwarn"
 _LOG_N = "log"
 
 
+def _dfid_fmt(df_id, id_ismloc):
+    """
+    returns the part of a warning message that identifies a DataFrame; see
+    _dfvalwarn for the formats.
+    """
+    # if id_ismloc is True, report the memory location of df
+    if (id_ismloc == True):
+        # if df_id is unknown
+        if (df_id == "unknown"):
+            return " at 0x??"
+        # else use normal format for id
+        return " at 0x{0:x}".format(df_id)
+    # else id_ismloc is False; if df_id is unknown, use this format
+    if (df_id == "unknown"):
+        return ", unknown id"
+    # else use normal format for id
+    return ", id={0}".format(df_id)
+
 def _dfvalwarn(df, qual = "invalid", lib_n = "anon_lib", func_n = "anon_func",
                df_id = "unknown", id_ismloc = False, col = "??", row = "??"):
     """
@@ -106,22 +133,7 @@ def _dfvalwarn(df, qual = "invalid", lib_n = "anon_lib", func_n = "anon_func",
         raise TypeError("{0}.{1}: error: row must be str or int".format(
             _LIBNAME, _DFVALWARN_N))
     # set the correct format for reporting the df_id or memory location of df
-    # if id_ismloc is True
-    if (id_ismloc == True):
-        # if df_id is unknown
-        if (df_id == "unknown"):
-            id_fmt = " at 0x??"
-        # else use normal format for id
-        else:
-            id_fmt = " at 0x{0:x}".format(df_id)
-    # else id_ismloc is False
-    else:
-        # if df_id is unknown, use this format
-        if (df_id == "unknown"):
-            id_fmt = ", unknown id"
-        # else use normal format for id
-        else:
-            id_fmt = ", id={0}".format(df_id)
+    id_fmt = _dfid_fmt(df_id, id_ismloc)
     # set the correct format for columns and rows
     if (col != "??" and isinstance(col, str)):
         col = "'{0}'".format(col)
@@ -134,7 +146,71 @@ def _dfvalwarn(df, qual = "invalid", lib_n = "anon_lib", func_n = "anon_func",
         lib_n, func_n, id_fmt, col_fmt, row_fmt, qual), file = sys.stderr)
     return None
 
-def log(df, cns, base = "e", inplace = True, overwrite = False, quiet = False):
+def _dfcolwarn(df, counts, lib_n = "anon_lib", func_n = "anon_func",
+               df_id = "unknown", id_ismloc = False, col = "??", max_rows = 5):
+    """
+    summarized version of _dfvalwarn for functions that check a whole column
+    of a DataFrame at once. issues a single warning for the column, listing how
+    many values of each kind were found and the first max_rows offending rows
+    of each kind. messages will have the following format (printed to stderr):
+
+    libname.funcname: DataFrame df, id = id_n: df[col] has k_1 <qual_1> (rows
+    r_1, r_2, ...), k_2 <qual_2> (rows ...), ...
+
+    the row lists are left out if max_rows is 0. nothing is printed if every
+    count is 0.
+
+    parameters:
+
+    df          required dataframe
+    counts      required list of tuples (qual, rows), where qual describes the
+                kind of value (e.g. "NaN") and rows is an array_like of the rows
+                where it was found
+    lib_n       name of the library the function is in, default "anon_lib"
+    func_n      name of the function that encountered the values, default
+                "anon_func"
+    df_id       id of the DataFrame; see _dfvalwarn. default "unknown"
+    id_ismloc   default False; see _dfvalwarn
+    col         label/index of offending column in DataFrame, default "??"
+    max_rows    max number of rows listed per kind of value, default 5
+    """
+    # if df is not a DataFrame, raise TypeError
+    if (not isinstance(df, pd.DataFrame)):
+        raise TypeError("{0}.{1}: error: DataFrame required, {2} passed"
+                        "".format(_LIBNAME, _DFCOLWARN_N, type(df)))
+    # check that max_rows is a nonnegative int
+    if (not isinstance(max_rows, int) or max_rows < 0):
+        raise ValueError("{0}.{1}: error: max_rows must be a nonnegative int"
+                         "".format(_LIBNAME, _DFCOLWARN_N))
+    # one part per kind of value that was found
+    parts = []
+    for qual, rows in counts:
+        # skip kinds of values that were not found
+        if (len(rows) == 0):
+            continue
+        # if no rows are to be listed, only give the count
+        if (max_rows == 0):
+            parts.append("{0} {1}".format(len(rows), qual))
+            continue
+        shown = ", ".join(str(e) for e in rows[:max_rows])
+        # mark rows that were not listed
+        if (len(rows) > max_rows):
+            shown += ", ..."
+        parts.append("{0} {1} (rows {2})".format(len(rows), qual, shown))
+    # nothing to warn about
+    if (len(parts) == 0):
+        return None
+    # quote string column names, as in _dfvalwarn
+    if (col != "??" and isinstance(col, str)):
+        col = "'{0}'".format(col)
+    # print warning to stderr
+    print("{0}.{1}: DataFrame df{2}: df[{3}] has {4}".format(
+        lib_n, func_n, _dfid_fmt(df_id, id_ismloc), col, ", ".join(parts)),
+          file = sys.stderr)
+    return None
+
+def log(df, cns, base = "e", inplace = True, overwrite = False, quiet = False,
+        warn_rows = 5):
     """
     function that takes the natural (or base k) log of specified columns from a
     pandas dataframe. can either insert these columns next to the original
@@ -159,7 +235,13 @@ def log(df, cns, base = "e", inplace = True, overwrite = False, quiet = False):
                 transformed columns.
     quiet       optional named parameter, default False. set to True to suppress
                 warnings about NaN or nonpositive values for all  columns within
-                cns.
+                cns. warnings are summarized with one line per column.
+    warn_rows   optional named parameter, default 5. max number of offending
+                (positional) rows listed per kind of value in the warnings; 0
+                gives only the counts.
+
+    NaN and non-numeric values become NaN, 0 becomes -inf, and negative values
+    become NaN.
     """
     # if df is None, raise ValueError
     if (df is None):
@@ -220,49 +302,39 @@ def log(df, cns, base = "e", inplace = True, overwrite = False, quiet = False):
     if (col_err == True):
         raise KeyError("{0}.{1}: error: columns {2} not found".format(
             _LIBNAME, _LOG_N, err_cols))
-    # for each column, create a copy, forcibly convert to numeric (replace all
-    # non-numeric values with NaN), and then process logarithms as necessary
+    # log of the base; the log of each value is divided by it, as in math.log
+    log_base = math.log(base)
+    # for each column, forcibly convert to numeric (replace all non-numeric
+    # values with NaN), and then take logarithms of the whole column at once
     # before assigning resulting column to df
     for cn in cns:
-        # if overwrite is True, apply to_numeric to df[cn]; any non-numeric
-        # or blank values will be replaced with NaN
-        if (overwrite == True):
-            df.loc[:, cn] = pd.to_numeric(df[cn], errors = "coerce")
-            col = df.loc[:, cn]
-        # else create copy of series from the DataFrame and coerce to numeric
+        # coerce to numeric; any non-numeric or blank values will be NaN
+        vals = pd.to_numeric(df[cn], errors = "coerce").to_numpy(dtype = float)
+        # masks of the values that cannot have their log taken
+        nan_m = np.isnan(vals)
+        zero_m = vals == 0
+        neg_m = vals < 0
+        # if quiet is False, print one summary warning for the column
+        if (quiet == False):
+            _dfcolwarn(df, [("NaN", np.flatnonzero(nan_m)),
+                            ("zero (set to -inf)", np.flatnonzero(zero_m)),
+                            ("negative (set to NaN)", np.flatnonzero(neg_m))],
+                       lib_n = _LIBNAME, func_n = _LOG_N, df_id = id(df),
+                       id_ismloc = True, col = cn, max_rows = warn_rows)
+        # NaN by default, which covers NaN and negative values
+        out = np.full(vals.shape, np.nan)
+        # log of the positive values
+        pos_m = vals > 0
+        if (base == np.e):
+            out[pos_m] = np.log(vals[pos_m])
         else:
-            col = pd.to_numeric(df[cn], errors = "coerce")
-        # for each element in col
-        for i in range(col.size):
-            # if the element is NaN
-            if (math.isnan(col.iloc[i])):
-                # if quiet is False, print warning
-                if (quiet == False):
-                    _dfvalwarn(df, qual = "is NaN", lib_n = _LIBNAME,
-                               func_n = _LOG_N, df_id = id(df), id_ismloc = True,
-                               col = cn, row = i)
-                # col[i] already NaN so don't do anything
-            # else if element is 0
-            elif (col.iloc[i] == 0):
-                # if quiet is False, print warning
-                if (quiet == False):
-                    _dfvalwarn(df, qual = "is 0", lib_n = _LIBNAME,
-                               func_n = _LOG_N, df_id = id(df), id_ismloc = True,
-                               col = cn, row = i)
-                # set col[i] to np.NINF
-                col.iloc[i] = np.NINF
-            # else if element is less than 0
-            elif (col.iloc[i] <= 0):
-                # if quiet is False, print warning
-                if (quiet == False):
-                    _dfvalwarn(df, qual = "< 0", lib_n = _LIBNAME,
-                               func_n = _LOG_N, df_id = id(df), id_ismloc = True,
-                               col = cn, row = i)
-                # set col[i] to np.nan
-                col.iloc[i] = np.nan
-            # else calculate log value normally
-            else:
-                col.iloc[i] = math.log(col.iloc[i], base)
+            out[pos_m] = np.log(vals[pos_m]) / log_base
+        # 0 maps to -inf
+        out[zero_m] = -np.inf
+        col = pd.Series(out, index = df.index)
+        # if overwrite is True, replace the original column
+        if (overwrite == True):
+            df[cn] = col
         # after taking the log of all values in col, assign it back to df
         # with the modified column name (as according to the base used)
         # if overwrite is True, rename inplace
@@ -2,11 +2,38 @@
 contains method for pricing options using the binomial tree approach. note that
 all parameters have to be constant; for stochastic approach, which requires a
 stochastic process for the underlying as well, refer to stochastic_option
-(doesn't exist yet)
 """
 #
 # Changelog:
 #
+# 10-17-2026
+#
+# added a numpy backward induction engine that rolls each tree level with whole
+# array slice operations, using a precomputed discount factor and a geometric
+# price ladder for the american early exercise max. the original double loop
+# is kept as the "loop" backend for reference; select with backend parameter.
+# added option_chain_price, which prices a whole vector of strikes (and
+# optionally per-strike vols) with a single 2-D (strike x node) rollback.
+# moved parameter checks and tree parameters into _check_args, _tree_params.
+# added an lru cache of the strike-independent lattice (u, p_u, p_d, discount
+# factor and price ladder) keyed on S_, sigma, r, q and the tree shape, with a
+# configurable memory cap. see lattice_cache_info, lattice_cache_clear and
+# set_lattice_cache_size.
+# added option_greeks, which returns price, delta, gamma and theta from one
+# backward induction by reading the greeks off of tree levels 1 and 2.
+# added method parameter to option_price and option_chain_price. "bbs" replaces
+# the last tree step with black-scholes values and "bbsr" adds two-level
+# richardson extrapolation, giving smooth, fast convergence in tree height.
+# added bsm_price, a closed-form black-scholes-merton evaluator vectorized over
+# strikes. option_price and option_chain_price now route european options and
+# american calls with q = 0 to it unless analytic = False. its normal cdf is
+# the numpy erfc of lib/special, shared with rate_models/short_rate_1f.
+# has_closed_form, which tells which options are routed to bsm_price, is public.
+# american chains are now rolled back with early exercise boundary pruning:
+# nodes that are provably exercised or worthless skip the continuation value.
+# the boundary itself is available with boundary = True.
+# module docstring now points to stochastic_option, which exists.
+#
 # 01-27-2019
 #
 # made final edits to formula; although prices deviate significantly from those
@@ -33,14 +60,24 @@ stochastic process for the underlying as well, refer to stochastic_option
 # name of method to option_price.
 #
 
+from collections import namedtuple, OrderedDict
 import math
+import numbers
 import numpy as np
+import lib.special as special
 
 # library name
 _LIB_NAME = "bopm"
 
 # function names
 _OPTION_PRICE_N = "option_price"
+_OPTION_CHAIN_PRICE_N = "option_chain_price"
+_OPTION_GREEKS_N = "option_greeks"
+_BSM_PRICE_N = "bsm_price"
+_SET_LATTICE_CACHE_SIZE_N = "set_lattice_cache_size"
+
+# default memory cap for the lattice cache, in bytes (64 MiB)
+_LATTICE_CACHE_BYTES = 64 * 1024 * 1024
 
 # allowable option types
 _option_types = ["call", "put"]
@@ -48,87 +85,25 @@ _option_types = ["call", "put"]
 # allowable option flavors
 _option_flavors = ["american", "european"]
 
-def option_price(S_, sigma, r, K, T_, q = 0, d_dt = 1, is_type = "call",
-                 flavor = "european"):
-    """
-    implementation of the binomial call option pricing model. uses the original
-    cox/ross/rubenstein binomial tree method. time step assumed to be one 1 day.
+# allowable pricing backends; "loop" is the original reference implementation
+_backends = ["numpy", "loop"]
 
-    parameters:
+# min number of strikes before the american rollback prunes the tree; pruning
+# adds a few small numpy calls per level, which a single strike doesn't repay
+_PRUNE_MIN_STRIKES = 8
 
-    S_        price of underlying at time 0.
-    sigma     constant underlying volatility of S
-    r         constant risk free rate
-    q         optional constant dividend (or other) yield, default 0
-    d_dt      optional number of time steps per day (adjusts fidelity and height
-              of the binomial tree), default 1. recommended to make d_dt < 20
-              because there is no need for excess fidelity
-    K         strike price of the option
-    T_        no. months until expiration; month/year standard is 30/360
-    is_type   "call", "put" (default "call")
-    flavor    style of option: can be "american", "european" (default "european")
+# allowable pricing methods; plain tree, black-scholes smoothed tree, and
+# smoothed tree with richardson extrapolation
+_methods = ["crr", "bbs", "bbsr"]
 
-    returns the price of the option at time 0 (now) as float
+def _loop_rollback(S_, K, n, u, p_u, p_d, r, dt, is_type, flavor):
+    """
+    reference pure python backward induction. this is the original double loop
+    from option_price, kept to check the numpy engine against. parameters are
+    the same as in _numpy_rollback.
     """
-    # cannot have negative underlying price
-    if (S_ < 0):
-        raise ValueError("{0}.{1}: error: initial underlying price cannot be "
-                         "negative".format(_LIB_NAME, _OPTION_PRICE_N))
-    # cannot have negative volatility
-    if (sigma < 0):
-        raise ValueError("{0}.{1}: error: volatility of underlying cannot be "
-                         "negative".format(_LIB_NAME, _OPTION_PRICE_N))
-    # warning if negative risk-free rate is passed
-    if (r < 0):
-        print("{0}.{1}: warning: negative risk-free rate".format(
-            _LIB_NAME, _OPTION_PRICE_N))
-    # cannot have negative strike price
-    if (K < 0):
-        raise ValueError("{0}.{1}: error: strike price cannot be negative"
-                         "".format(_LIB_NAME, _OPTION_PRICE_N))
-    # cannot have negative T_
-    if (T_ < 0):
-        raise ValueError("{0}.{1}: error: cannot have negative time to expiry"
-                         "".format(_LIB_NAME, _OPTION_PRICE_N))
-    # cannot have negative dividend rate
-    if (q < 0):
-        raise ValueError("{0}.{1}: error: cannot have negative dividend yield"
-                         "".format(_LIB_NAME, _OPTION_PRICE_N))
-    # cannot have d_dt be less than 1
-    if (d_dt < 1):
-        raise ValueError("{0}.{1}: error: cannot have less than one period per "
-                         "day".format(_LIB_NAME, _OPTION_PRICE_N))
-    # if is_type is not in _option_types
-    if (is_type not in _option_types):
-        raise ValueError("{0}.{1}: error: option type can only be {2}".format(
-            _LIB_NAME, _OPTION_PRICE_N, _option_types))
-    # if flavor is not in _option_flavors
-    if (flavor not in _option_flavors):
-        raise ValueError("{0}.{1}: error: option flavor can only be {2}".format(
-            _LIB_NAME, _OPTION_PRICE_N, _option_flavors))
-    # number of days until option expiration is 30 * T_; also controls height of
-    # the generated binomial tree (multiplied by d_dt)
-    n = 30 * d_dt * T_
-    # if n is fractional, print error and exit
-    if (int(n) != float(n)):
-        raise ValueError("{0}.{1}: error: cannot have fractional number of days"
-                         " to expiration".format(_LIB_NAME, _OPTION_PRICE_N))
-    # size of time step is equal to one day; units must be in years. however,
-    # time step can be adjusted by d_dt parameter
-    dt = 1 / 360 / d_dt
     # number of final nodes for option values is n + 1
     vals = np.empty(n + 1)
-    # up factor; down factor is the inverse of the up factor
-    u = math.exp(sigma * math.sqrt(dt))
-    # if sigma is 0, no volatility, so p_u == p_d == 0
-    if (sigma == 0):
-        p_u = p_d = 0
-    # else
-    else:
-        # probability of the underlying moving up
-        p_u = (u * math.exp((r - q) * dt) - 1) / (u * u - 1)
-        # probability of the underlying moving down
-        p_d = 1 - p_u
     # calculate final values for all nodes
     # if the option is a call option
     if (is_type == "call"):
@@ -166,3 +141,854 @@ def option_price(S_, sigma, r, K, T_, q = 0, d_dt = 1, is_type = "call",
                     vals[j] = max(vals[j], K - S_ * pow(u, 2 * j - n + i + 1))
     # vals[0] is the expectation options price
     return vals[0]
+
+def _check_args(func_n, S_, sigma, r, K, T_, q, d_dt, is_type, flavor):
+    """
+    checks the parameters shared by the pricing functions, raising ValueError
+    on invalid input. sigma and K may be scalars or array_like. func_n is the
+    name of the calling function, used in the error messages.
+
+    returns the tree height n (int) and the time step dt (in years)
+    """
+    # cannot have negative underlying price
+    if (S_ < 0):
+        raise ValueError("{0}.{1}: error: initial underlying price cannot be "
+                         "negative".format(_LIB_NAME, func_n))
+    # cannot have negative volatility
+    if (np.any(np.asarray(sigma) < 0)):
+        raise ValueError("{0}.{1}: error: volatility of underlying cannot be "
+                         "negative".format(_LIB_NAME, func_n))
+    # warning if negative risk-free rate is passed
+    if (r < 0):
+        print("{0}.{1}: warning: negative risk-free rate".format(
+            _LIB_NAME, func_n))
+    # cannot have negative strike price
+    if (np.any(np.asarray(K) < 0)):
+        raise ValueError("{0}.{1}: error: strike price cannot be negative"
+                         "".format(_LIB_NAME, func_n))
+    # cannot have negative T_
+    if (T_ < 0):
+        raise ValueError("{0}.{1}: error: cannot have negative time to expiry"
+                         "".format(_LIB_NAME, func_n))
+    # cannot have negative dividend rate
+    if (q < 0):
+        raise ValueError("{0}.{1}: error: cannot have negative dividend yield"
+                         "".format(_LIB_NAME, func_n))
+    # cannot have d_dt be less than 1
+    if (d_dt < 1):
+        raise ValueError("{0}.{1}: error: cannot have less than one period per "
+                         "day".format(_LIB_NAME, func_n))
+    # if is_type is not in _option_types
+    if (is_type not in _option_types):
+        raise ValueError("{0}.{1}: error: option type can only be {2}".format(
+            _LIB_NAME, func_n, _option_types))
+    # if flavor is not in _option_flavors
+    if (flavor not in _option_flavors):
+        raise ValueError("{0}.{1}: error: option flavor can only be {2}".format(
+            _LIB_NAME, func_n, _option_flavors))
+    # number of days until option expiration is 30 * T_; also controls height of
+    # the generated binomial tree (multiplied by d_dt)
+    n = 30 * d_dt * T_
+    # if n is fractional, print error and exit
+    if (int(n) != float(n)):
+        raise ValueError("{0}.{1}: error: cannot have fractional number of days"
+                         " to expiration".format(_LIB_NAME, func_n))
+    # size of time step is equal to one day; units must be in years. however,
+    # time step can be adjusted by d_dt parameter
+    dt = 1 / 360 / d_dt
+    # n is integral from here on; T_ may have been passed as a float
+    return int(n), dt
+
+def _tree_params(sigma, r, q, dt):
+    """
+    returns the up factor u and the up/down probabilities p_u, p_d for a time
+    step of dt. if sigma is an array, each returned value is an array of the
+    same shape. down factor is the inverse of the up factor.
+    """
+    # if sigma is a scalar, keep the original scalar arithmetic
+    if (np.ndim(sigma) == 0):
+        # up factor; down factor is the inverse of the up factor
+        u = math.exp(sigma * math.sqrt(dt))
+        # if sigma is 0, no volatility, so p_u == p_d == 0
+        if (sigma == 0):
+            return u, 0, 0
+        # probability of the underlying moving up
+        p_u = (u * math.exp((r - q) * dt) - 1) / (u * u - 1)
+        # probability of the underlying moving down
+        return u, p_u, 1 - p_u
+    # else same formulas applied elementwise
+    sigma = np.asarray(sigma, dtype = float)
+    u = np.exp(sigma * math.sqrt(dt))
+    # zero volatility entries divide by zero; they are set to 0 afterwards
+    with np.errstate(divide = "ignore", invalid = "ignore"):
+        p_u = (u * math.exp((r - q) * dt) - 1) / (u * u - 1)
+    p_d = 1 - p_u
+    p_u[sigma == 0] = 0
+    p_d[sigma == 0] = 0
+    return u, p_u, p_d
+
+# precomputed, strike-independent parts of a tree. sigma, u, p_u, p_d are
+# scalars or (k, 1) arrays for per-strike vols, disc is the one step discount
+# factor, ladder holds the underlying price S_ * u ** k, k = -n, ... n, at every
+# node, and r, q, dt are kept for the black-scholes smoothing step
+_Lattice = namedtuple("_Lattice", ["sigma", "u", "p_u", "p_d", "disc",
+                                   "ladder", "r", "q", "dt"])
+
+# greeks returned by option_greeks(); theta is per year
+Greeks = namedtuple("Greeks", ["price", "delta", "gamma", "theta"])
+
+# statistics returned by lattice_cache_info()
+LatticeCacheInfo = namedtuple("LatticeCacheInfo",
+                              ["hits", "misses", "entries", "nbytes",
+                               "max_bytes"])
+
+class _LatticeCache:
+    """
+    bounded least recently used cache of _Lattice objects, keyed on the tree
+    shape parameters (S_, sigma, r, q, n, dt). the size of the cache is capped
+    by the total number of bytes held in the lattice arrays; least recently
+    used entries are evicted until the cache fits under max_bytes. a lattice
+    that is larger than max_bytes by itself is never stored.
+    """
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.nbytes = 0
+        self._entries = OrderedDict()
+
+    def get(self, key):
+        """
+        returns the lattice for key, or None if not cached. moves the entry to
+        the most recently used end and counts the hit or miss.
+        """
+        lat = self._entries.get(key)
+        # count miss and return None
+        if (lat is None):
+            self.misses += 1
+            return None
+        # else move to most recently used end and count hit
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return lat
+
+    def put(self, key, lat):
+        """
+        inserts lattice for key, evicting least recently used entries until the
+        cache fits under max_bytes again.
+        """
+        size = _lattice_nbytes(lat)
+        # don't store lattices that could never fit
+        if (size > self.max_bytes):
+            return None
+        # if key already present, replace entry
+        if (key in self._entries):
+            self.nbytes -= _lattice_nbytes(self._entries.pop(key))
+        self._entries[key] = lat
+        self.nbytes += size
+        self._evict()
+        return None
+
+    def resize(self, max_bytes):
+        """sets a new byte cap, evicting entries as necessary."""
+        self.max_bytes = max_bytes
+        self._evict()
+        return None
+
+    def clear(self):
+        """drops all entries and resets the hit and miss counters."""
+        self._entries.clear()
+        self.nbytes = self.hits = self.misses = 0
+        return None
+
+    def info(self):
+        """returns a LatticeCacheInfo with the current cache statistics."""
+        return LatticeCacheInfo(self.hits, self.misses, len(self._entries),
+                                self.nbytes, self.max_bytes)
+
+    def _evict(self):
+        # pop least recently used entries until we are under the cap
+        while (self.nbytes > self.max_bytes):
+            _, lat = self._entries.popitem(last = False)
+            self.nbytes -= _lattice_nbytes(lat)
+        return None
+
+def _lattice_nbytes(lat):
+    """returns total number of bytes held in the arrays of a _Lattice."""
+    return sum(np.asarray(e).nbytes for e in lat)
+
+# module-level lattice cache used by option_price and option_chain_price
+_lattice_cache = _LatticeCache(_LATTICE_CACHE_BYTES)
+
+def lattice_cache_info():
+    """
+    returns a LatticeCacheInfo namedtuple (hits, misses, entries, nbytes,
+    max_bytes) describing the state of the lattice cache used by the numpy
+    backend of option_price and option_chain_price.
+    """
+    return _lattice_cache.info()
+
+def lattice_cache_clear():
+    """clears the lattice cache and resets its hit and miss counters."""
+    return _lattice_cache.clear()
+
+def set_lattice_cache_size(max_bytes):
+    """
+    sets the memory cap of the lattice cache, in bytes. least recently used
+    lattices are evicted if the cache no longer fits. set to 0 to disable
+    caching entirely.
+    """
+    # cap must be a nonnegative int (numpy ints included)
+    if (not isinstance(max_bytes, numbers.Integral) or max_bytes < 0):
+        raise ValueError("{0}.{1}: error: max_bytes must be a nonnegative int"
+                         "".format(_LIB_NAME, _SET_LATTICE_CACHE_SIZE_N))
+    return _lattice_cache.resize(int(max_bytes))
+
+def _get_lattice(S_, sigma, r, q, n, dt, cache = True):
+    """
+    returns the _Lattice for the given tree shape parameters, from the lattice
+    cache if possible (the cache is skipped entirely if cache is False). sigma
+    is a scalar or a 1-D array of per-strike vols; in the latter case u, p_u,
+    p_d are returned as (k, 1) columns so that they broadcast against (strike x
+    node) arrays. the ladder is made read only since it is shared between
+    calls.
+    """
+    # per-strike vols are keyed on their raw bytes
+    if (np.ndim(sigma) == 0):
+        sigma_key = float(sigma)
+    else:
+        sigma_key = np.asarray(sigma, dtype = float).tobytes()
+    key = (float(S_), sigma_key, float(r), float(q), n, dt)
+    # return if cached
+    if (cache == True):
+        lat = _lattice_cache.get(key)
+        if (lat is not None):
+            return lat
+    # else compute up factor and up/down probabilities
+    u, p_u, p_d = _tree_params(sigma, r, q, dt)
+    if (np.ndim(sigma) != 0):
+        u, p_u, p_d = u[:, np.newaxis], p_u[:, np.newaxis], p_d[:, np.newaxis]
+        sigma = np.asarray(sigma, dtype = float)[:, np.newaxis]
+    # geometric price ladder; node j at level m (m + 1 nodes) has underlying
+    # price S_ * u ** (2 * j - m), which is ladder[..., n - m + 2 * j]
+    ladder = S_ * np.power(u, np.arange(-n, n + 1, dtype = float))
+    ladder.flags.writeable = False
+    # discount factor for one time step
+    lat = _Lattice(sigma, u, p_u, p_d, math.exp(-r * dt), ladder, r, q, dt)
+    if (cache == True):
+        _lattice_cache.put(key, lat)
+    return lat
+
+# standard normal cdf, elementwise; see lib/special
+_norm_cdf = special.norm_cdf
+
+def _bsm(S, K, sigma, r, q, tau, is_type):
+    """
+    black-scholes-merton price of a european option, elementwise over S, K and
+    sigma (which must broadcast together). tau is the time to expiry in years.
+    where sigma or tau is 0, the price is the discounted intrinsic value of the
+    forward, which is the limit of the formula.
+    """
+    S, K, sigma = np.broadcast_arrays(np.asarray(S, dtype = float),
+                                      np.asarray(K, dtype = float),
+                                      np.asarray(sigma, dtype = float))
+    # discounted forward and strike
+    fwd = S * math.exp(-q * tau)
+    pvk = K * math.exp(-r * tau)
+    # total standard deviation; zero entries are handled separately
+    sd = sigma * math.sqrt(tau)
+    live = (sd > 0) & (K > 0)
+    with np.errstate(divide = "ignore", invalid = "ignore"):
+        d_1 = np.log(fwd / pvk) / sd + 0.5 * sd
+    d_2 = d_1 - sd
+    if (is_type == "call"):
+        price = np.where(live, fwd * _norm_cdf(np.where(live, d_1, 0)) -
+                         pvk * _norm_cdf(np.where(live, d_2, 0)),
+                         np.maximum(fwd - pvk, 0))
+    else:
+        price = np.where(live, pvk * _norm_cdf(np.where(live, -d_2, 0)) -
+                         fwd * _norm_cdf(np.where(live, -d_1, 0)),
+                         np.maximum(pvk - fwd, 0))
+    return price
+
+def has_closed_form(r, q, is_type, flavor):
+    """
+    returns True if the option has a closed-form black-scholes-merton price:
+    european options, and american calls on an underlying with no dividend
+    yield and a nonnegative rate, which are never optimal to exercise early.
+    these are the options that option_price and option_chain_price route to
+    bsm_price when analytic is True.
+
+    parameters:
+
+    r         constant risk free rate
+    q         constant dividend (or other) yield
+    is_type   "call", "put"
+    flavor    "american", "european"
+    """
+    if (flavor == "european"):
+        return True
+    return (is_type == "call" and q == 0 and r >= 0)
+
+def _prefix_count(B):
+    """returns the number of leading True values in each row of 2-D bool B."""
+    # empty rows have no leading True values
+    if (B.shape[1] == 0):
+        return np.zeros(B.shape[0], dtype = int)
+    return np.where(B.all(axis = 1), B.shape[1], np.argmin(B, axis = 1))
+
+def _exercise_crit(S_, lat, K, is_type):
+    """
+    the american rollback can skip the continuation value of a node whose two
+    children are both exercised, when exercising the node is provably better.
+    with both children at intrinsic value, since p_u * u + p_d * d is equal to
+    exp((r - q) * dt), the continuation value minus the exercise value is
+
+    put:  S * (1 - g) - K * (1 - disc)
+    call: K * (1 - disc) - S * (1 - g)
+
+    where g = exp(-q * dt), and exercising is better when this is negative,
+    which holds for S below (put) or above (call) a critical price S_crit.
+
+    returns c = log(S_crit / S_) / log(u) per strike, the critical price in
+    units of tree steps: node j of level l qualifies if 2 * j - l < c for puts,
+    or 2 * j - l > c for calls. rows that never qualify get -inf (puts) or inf
+    (calls), and rows where every node qualifies get the opposite.
+    """
+    # value of c for rows that never qualify
+    never = -np.inf if is_type == "put" else np.inf
+    g = math.exp(-lat.q * lat.dt)
+    num = K * (1 - lat.disc)
+    log_u = np.broadcast_to(np.log(np.ravel(lat.u)), K.shape)
+    with np.errstate(divide = "ignore", invalid = "ignore"):
+        # no dividend yield; the sign of num alone decides
+        if (g == 1):
+            if (is_type == "put"):
+                c = np.where(num > 0, np.inf, -np.inf)
+            else:
+                c = np.where(num < 0, -np.inf, np.inf)
+        # else compare against the critical price; a nonpositive critical price
+        # means no node qualifies for puts, and every node does for calls
+        else:
+            s_crit = num / (1 - g)
+            c = np.where(s_crit > 0, np.log(s_crit / S_), -np.inf)
+        # zero vol rows have no tree to speak of; never prune them
+        c = np.where(log_u > 0, c / np.where(log_u > 0, log_u, 1), never)
+    return c
+
+def _leading(B, start = 0, window = 8):
+    """
+    returns the number of leading columns of 2-D bool B, from column start on,
+    that are True in every row. checks a small window of columns first, since
+    the count usually changes by a node or two from one tree level to the next.
+    """
+    stop = min(start + window, B.shape[1])
+    cols = B[:, start:stop].all(axis = 0)
+    # not all True in the window, so the count ends inside it
+    if (not cols.all()):
+        return start + int(np.argmin(cols))
+    # else look at the rest of the columns
+    cols = B[:, stop:].all(axis = 0)
+    if (cols.all()):
+        return B.shape[1]
+    return stop + int(np.argmin(cols))
+
+def _american_rollback(S_, vals, ex_vals, lat, K, n, top, is_type, levels,
+                       boundary):
+    """
+    american backward induction with early exercise boundary pruning. vals are
+    the option values at level top, and are rolled back in place.
+
+    the rollback tracks how many nodes at the edge of the tree are exercised
+    for every strike (the low end for puts, the high end for calls), and where
+    the region of zero valued, deep out of the money nodes starts (the high end
+    for puts, the low end for calls). at the next level, a node whose two
+    children are both zero is zero, and a node whose two children are both
+    exercised is exercised if _exercise_crit says so. only the nodes between
+    these two regions have their continuation value computed; since all strikes
+    share one slice, the regions are taken over all strikes at once. values
+    are the same as without pruning.
+
+    returns tuple (vals_1, vals_2, bnd), where vals_1 and vals_2 are the values
+    at levels 1 and 2 if levels is True (else None). if boundary is True, bnd
+    is an array of shape (k, n + 1) giving, per strike and level, the price of
+    the underlying at the edge of the exercised region: the highest exercised
+    price for puts, the lowest for calls. bnd is NaN at levels where no node is
+    exercised, and at level n if the tree starts from level n - 1. if boundary
+    is False, bnd is None.
+    """
+    p_u, p_d, disc = lat.p_u, lat.p_d, lat.disc
+    k = K.size
+    is_put = (is_type == "put")
+    # values at levels 1 and 2; only filled in if levels is True
+    vals_1 = vals_2 = bnd = None
+    # no strikes, nothing to roll back
+    if (k == 0):
+        if (boundary == True):
+            bnd = np.empty((0, n + 1))
+        return vals_1, vals_2, bnd
+    # critical price for provable exercise, in tree steps; only the least
+    # favorable strike matters for the shared slice
+    c = _exercise_crit(S_, lat, K, is_type)
+    c = c.min() if is_put else c.max()
+    # exercise values at the top level (top + 1 nodes). for puts, n_ex is the
+    # number of leading nodes exercised for every strike, and nodes from z on
+    # are zero for every strike. for calls, n_ex counts trailing nodes instead,
+    # and nodes below z are zero for every strike
+    ex_top = ex_vals[:, n - top:n + top + 1:2]
+    if (is_put):
+        n_ex = _leading(vals == ex_top)
+        z = top + 1 - _leading((vals == 0)[:, ::-1])
+    else:
+        n_ex = _leading((vals == ex_top)[:, ::-1])
+        z = _leading(vals == 0)
+    # per strike exercise counts, only needed for the boundary
+    if (boundary == True):
+        ladder = np.broadcast_to(np.atleast_2d(lat.ladder), (k, 2 * n + 1))
+        bnd = np.full((k, n + 1), np.nan)
+        rows = np.arange(k)
+        if (is_put):
+            r_ex = _prefix_count(vals == ex_top)
+        else:
+            r_ex = _prefix_count((vals == ex_top)[:, ::-1])
+    # a tree of height 2 starts at level 2, which the loop never copies
+    if (levels == True and top == 2):
+        vals_2 = vals[:, :3].copy()
+    # roll back from level top to level 0; m is the number of nodes at the new
+    # level, whose index is m - 1
+    for m in range(top, -1, -1):
+        # record boundary at level m (m + 1 nodes) before moving on
+        if (boundary == True):
+            has_ex = r_ex > 0
+            j = r_ex - 1 if is_put else m + 1 - r_ex
+            idx = np.clip(n - m + 2 * j, 0, 2 * n)
+            bnd[has_ex, m] = ladder[rows, idx][has_ex]
+        # done after recording level 0
+        if (m == 0):
+            break
+        # exercise values at the new level
+        ex_m = ex_vals[:, n - m + 1:n + m:2]
+        # number of nodes at the new level past the critical price; slightly
+        # conservative so that rounding can never prune a node it shouldn't
+        if (math.isinf(c)):
+            n_crit = m if (c > 0) == is_put else 0
+        elif (is_put):
+            n_crit = min(max(math.ceil((m - 1 + c) / 2 - 1e-7), 0), m)
+        else:
+            n_crit = min(max(m - 1 - math.floor((m - 1 + c) / 2 + 1e-7), 0), m)
+        # provably exercised and zero nodes at the new level; [lo, hi) is the
+        # slice where continuation values are needed
+        p_ex = min(max(n_ex - 1, 0), n_crit)
+        if (is_put):
+            z = min(z, m)
+            lo, hi = p_ex, z
+        else:
+            z = min(max(z - 1, 0), m)
+            lo, hi = z, m - p_ex
+        # continuation values only between the two regions. children in the
+        # zero region are already zero, so nodes there need no update
+        if (hi > lo):
+            vals[:, lo:hi] = disc * (p_u * vals[:, lo + 1:hi + 1] +
+                                     p_d * vals[:, lo:hi])
+            np.maximum(vals[:, lo:hi], ex_m[:, lo:hi], out = vals[:, lo:hi])
+        # exercised region is set to intrinsic value; done after the slice
+        # above, since for calls it overwrites children the slice reads
+        if (is_put):
+            vals[:, :lo] = ex_m[:, :lo]
+            B = vals[:, lo:hi] == ex_m[:, lo:hi]
+            n_ex = lo + _leading(B)
+        else:
+            vals[:, hi:m] = ex_m[:, hi:m]
+            B = (vals[:, lo:hi] == ex_m[:, lo:hi])[:, ::-1]
+            n_ex = m - hi + _leading(B)
+        # per strike counts for the boundary
+        if (boundary == True):
+            r_ex = (lo if is_put else m - hi) + _prefix_count(B)
+        # if requested, keep levels 2 and 1 on the way down
+        if (levels == True):
+            if (m == 3):
+                vals_2 = vals[:, :3].copy()
+            elif (m == 2):
+                vals_1 = vals[:, :2].copy()
+    return vals_1, vals_2, bnd
+
+def _numpy_rollback(lat, K, n, is_type, flavor, levels = False, bbs = False,
+                    prune = True, boundary = False):
+    """
+    vectorized backward induction. instead of visiting each node, each level of
+    the tree is rolled back with one slice operation. the discount factor is
+    computed once, and the underlying prices at every node are read off of the
+    precomputed geometric ladder in lat, so no pow() calls are made during the
+    rollback. returns the same values as _loop_rollback.
+
+    all strikes are rolled back together as one 2-D (strike x node) array, so a
+    whole option chain costs one pass over the tree levels. only the payoff
+    work here depends on the strikes; everything in lat can be reused.
+
+    parameters:
+
+    lat       _Lattice holding u, p_u, p_d, disc and the price ladder
+    K         1-D array of strike prices, length k
+    n         height of the tree (number of time steps)
+    is_type   "call" or "put"
+    flavor    "american" or "european"
+    levels    optional, default False. if True, also keep copies of the option
+              values at tree levels 1 and 2, which are needed for the greeks
+    bbs       optional, default False. if True, the last step of the tree is
+              replaced by the black-scholes value of a one step option at each
+              node of level n - 1 (binomial black-scholes smoothing)
+    prune     optional, default True. if True, american chains of at least
+              _PRUNE_MIN_STRIKES strikes are rolled back with _american_rollback,
+              which skips nodes that are provably exercised or worthless
+    boundary  optional, default False. if True, also return the early exercise
+              boundary from _american_rollback (american options only)
+
+    returns 1-D array of length k of option prices at time 0. if levels is True,
+    returns tuple (prices, vals_1, vals_2) where vals_1 and vals_2 are arrays of
+    shape (k, 2) and (k, 3) holding the option values at levels 1 and 2. if
+    boundary is True, the boundary array of shape (k, n + 1) is appended.
+    """
+    p_u, p_d, disc = lat.p_u, lat.p_d, lat.disc
+    # values at levels 1 and 2; only filled in if levels is True
+    vals_1 = vals_2 = None
+    # exercise values for each strike; calls are S - K, puts are K - S
+    if (is_type == "call"):
+        ex_vals = lat.ladder - K[:, np.newaxis]
+    else:
+        ex_vals = K[:, np.newaxis] - lat.ladder
+    # terminal values are the intrinsic values at level n
+    if (bbs == False):
+        top = n
+        vals = np.maximum(ex_vals[:, ::2], 0)
+    # else start at level n - 1 from the black-scholes value over one step
+    else:
+        top = n - 1
+        vals = _bsm(lat.ladder[..., 1:2 * n:2], K[:, np.newaxis], lat.sigma,
+                    lat.r, lat.q, lat.dt, is_type)
+        vals = np.broadcast_to(vals, (K.size, n)).copy()
+        # if american, can also exercise at level n - 1
+        if (flavor == "american"):
+            np.maximum(vals, ex_vals[:, 1:2 * n:2], out = vals)
+    # american rollback with early exercise boundary pruning
+    if (flavor == "american" and (boundary == True or
+        (prune == True and K.size >= _PRUNE_MIN_STRIKES))):
+        S_ = np.ravel(lat.ladder)[n]
+        vals_1, vals_2, bnd = _american_rollback(S_, vals, ex_vals, lat, K, n,
+                                                 top, is_type, levels, boundary)
+        out = (vals[:, 0],)
+        if (levels == True):
+            out += (vals_1, vals_2)
+        if (boundary == True):
+            out += (bnd,)
+        return out if len(out) > 1 else out[0]
+    # a tree of height 2 starts at level 2, which the loop never copies
+    if (levels == True and top == 2):
+        vals_2 = vals[:, :3].copy()
+    # roll back from level top to level 0; m is the number of nodes at the new
+    # level. the right hand side is evaluated before assignment, so the slices
+    # overlapping is not a problem
+    for m in range(top, 0, -1):
+        vals[:, :m] = disc * (p_u * vals[:, 1:m + 1] + p_d * vals[:, :m])
+        # if american, take max against exercise values at level m - 1
+        if (flavor == "american"):
+            np.maximum(vals[:, :m], ex_vals[:, n - m + 1:n + m:2],
+                       out = vals[:, :m])
+        # if requested, keep levels 2 and 1 on the way down
+        if (levels == True):
+            if (m == 3):
+                vals_2 = vals[:, :3].copy()
+            elif (m == 2):
+                vals_1 = vals[:, :2].copy()
+    # vals[:, 0] are the expectation options prices
+    if (levels == True):
+        return vals[:, 0], vals_1, vals_2
+    return vals[:, 0]
+
+def _price_chain(S_, sigma, r, q, K, n, dt, is_type, flavor, method,
+                 cache = True, boundary = False):
+    """
+    prices strikes K (1-D array) on a tree of height n and time step dt with
+    the numpy engine, using the given method: "crr" is the plain tree, "bbs"
+    smooths the last step with black-scholes, and "bbsr" runs a two-level
+    richardson extrapolation of bbs trees of height n and n // 2:
+
+    P = (n * P_bbs(n) - n_2 * P_bbs(n_2)) / (n - n_2), n_2 = n // 2
+
+    which is 2 * P_bbs(n) - P_bbs(n / 2) when n is even. the half height tree
+    spans the same time to expiry, so its time step is n * dt / n_2.
+
+    if boundary is True, returns tuple (prices, bnd) where bnd is the early
+    exercise boundary of the height n tree (see _american_rollback).
+    """
+    lat = _get_lattice(S_, sigma, r, q, n, dt, cache = cache)
+    # plain cox-ross-rubinstein tree; also used when there is no step to
+    # smooth (n = 0), where the price is the intrinsic value
+    if (method == "crr" or n < 1):
+        return _numpy_rollback(lat, K, n, is_type, flavor, boundary = boundary)
+    # black-scholes smoothed tree
+    p_n = _numpy_rollback(lat, K, n, is_type, flavor, bbs = True,
+                          boundary = boundary)
+    if (boundary == True):
+        p_n, bnd = p_n
+    # too short to extrapolate, or just smoothing requested
+    if (method == "bbs" or n < 2):
+        return (p_n, bnd) if boundary == True else p_n
+    # richardson extrapolation against the half height tree
+    n_2 = n // 2
+    lat_2 = _get_lattice(S_, sigma, r, q, n_2, n * dt / n_2, cache = cache)
+    p_2 = _numpy_rollback(lat_2, K, n_2, is_type, flavor, bbs = True)
+    p_n = (n * p_n - n_2 * p_2) / (n - n_2)
+    return (p_n, bnd) if boundary == True else p_n
+
+def option_price(S_, sigma, r, K, T_, q = 0, d_dt = 1, is_type = "call",
+                 flavor = "european", backend = "numpy", method = "crr",
+                 analytic = True, boundary = False):
+    """
+    implementation of the binomial call option pricing model. uses the original
+    cox/ross/rubenstein binomial tree method. time step assumed to be one 1 day.
+
+    parameters:
+
+    S_        price of underlying at time 0.
+    sigma     constant underlying volatility of S
+    r         constant risk free rate
+    q         optional constant dividend (or other) yield, default 0
+    d_dt      optional number of time steps per day (adjusts fidelity and height
+              of the binomial tree), default 1. recommended to make d_dt < 20
+              because there is no need for excess fidelity
+    K         strike price of the option
+    T_        no. months until expiration; month/year standard is 30/360
+    is_type   "call", "put" (default "call")
+    flavor    style of option: can be "american", "european" (default "european")
+    backend   optional engine used for the backward induction, either "numpy"
+              (default), which rolls back each tree level with array slices, or
+              "loop", the original pure python implementation kept as reference
+    method    optional pricing scheme, default "crr" (plain tree). "bbs" replaces
+              the last step of the tree with black-scholes values, and "bbsr"
+              adds a two-level richardson extrapolation on top of "bbs", which
+              converges smoothly and much faster in the tree height, so a much
+              smaller d_dt gives the same accuracy. only "crr" is available
+              with the "loop" backend
+    analytic  optional, default True. european options, and american calls
+              with q = 0 and r >= 0 (never optimal to exercise early), are
+              priced with the closed-form black-scholes-merton formula instead
+              of a tree. set to False to force the tree. the "loop" backend
+              always uses the tree
+    boundary  optional, default False. american options only; if True, also
+              return the early exercise boundary. not available with the
+              "loop" backend
+
+    returns the price of the option at time 0 (now) as float. if boundary is
+    True, returns tuple (price, bnd), where bnd is a 1-D ndarray of length n + 1
+    (n the tree height) giving the underlying price at the edge of the exercise
+    region at each tree level: the highest exercised price for puts, and the
+    lowest for calls. bnd is NaN at levels with no exercised nodes.
+    """
+    # check parameters and get tree height and time step
+    n, dt = _check_args(_OPTION_PRICE_N, S_, sigma, r, K, T_, q, d_dt, is_type,
+                        flavor)
+    # if backend is not in _backends
+    if (backend not in _backends):
+        raise ValueError("{0}.{1}: error: backend can only be {2}".format(
+            _LIB_NAME, _OPTION_PRICE_N, _backends))
+    # if method is not in _methods
+    if (method not in _methods):
+        raise ValueError("{0}.{1}: error: method can only be {2}".format(
+            _LIB_NAME, _OPTION_PRICE_N, _methods))
+    # boundary only makes sense for american options on the numpy backend
+    if (boundary == True and (flavor != "american" or backend != "numpy")):
+        raise ValueError("{0}.{1}: error: boundary requires american flavor and "
+                         "numpy backend".format(_LIB_NAME, _OPTION_PRICE_N))
+    # closed-form fast path when the tree would just reproduce black-scholes
+    if (analytic == True and backend == "numpy" and
+        has_closed_form(r, q, is_type, flavor)):
+        price = float(_bsm(S_, K, sigma, r, q, n * dt, is_type))
+        # never exercised early, so there is no boundary
+        if (boundary == True):
+            return price, np.full(n + 1, np.nan)
+        return price
+    # roll back the tree with the selected backend
+    if (backend == "loop"):
+        # the reference implementation is the plain tree only
+        if (method != "crr"):
+            raise ValueError("{0}.{1}: error: loop backend only supports method "
+                             "\"crr\"".format(_LIB_NAME, _OPTION_PRICE_N))
+        # up factor and up/down probabilities
+        u, p_u, p_d = _tree_params(sigma, r, q, dt)
+        return _loop_rollback(S_, K, n, u, p_u, p_d, r, dt, is_type, flavor)
+    # roll back with the numpy engine
+    out = _price_chain(S_, sigma, r, q, np.array([K], dtype = float), n, dt,
+                       is_type, flavor, method, boundary = boundary)
+    if (boundary == True):
+        return float(out[0][0]), out[1][0]
+    return float(out[0])
+
+def option_chain_price(S_, sigma, r, K, T_, q = 0, d_dt = 1, is_type = "call",
+                       flavor = "european", cache = True, method = "crr",
+                       analytic = True, boundary = False):
+    """
+    prices a whole chain of options on the same underlying and expiry with one
+    backward induction. all strikes are rolled back together as a 2-D (strike x
+    node) array, and u, p_u, p_d and the price ladder are only computed once,
+    so a chain costs about as much as a single call to option_price.
+
+    parameters:
+
+    S_        price of underlying at time 0
+    sigma     constant underlying volatility of S; either a scalar shared by all
+              strikes, or array_like of per-strike vols with the same length as K
+    r         constant risk free rate
+    K         array_like of strike prices
+    T_        no. months until expiration; month/year standard is 30/360
+    q         optional constant dividend (or other) yield, default 0
+    d_dt      optional number of time steps per day, default 1
+    is_type   "call", "put" (default "call")
+    flavor    style of option: can be "american", "european" (default "european")
+    cache     optional, default True. set to False to bypass the lattice cache,
+              for example when sigma changes on every call as in a solver
+    method    optional pricing scheme, "crr" (default), "bbs" or "bbsr"; see
+              option_price for details
+    analytic  optional, default True. price european options and american
+              calls with q = 0 and r >= 0 with the closed-form black-scholes-
+              merton formula, vectorized over strikes. set to False to force
+              the tree
+    boundary  optional, default False. american options only; if True, also
+              return the early exercise boundary of each strike
+
+    returns 1-D ndarray of option prices at time 0, in the same order as K. if
+    boundary is True, returns tuple (prices, bnd), where bnd has shape
+    (len(K), n + 1); see option_price for its contents.
+    """
+    # flatten strikes to 1-D float array
+    K = np.asarray(K, dtype = float).ravel()
+    # if sigma is not a scalar, must have one vol per strike
+    if (np.ndim(sigma) != 0):
+        sigma = np.asarray(sigma, dtype = float).ravel()
+        if (sigma.size != K.size):
+            raise ValueError("{0}.{1}: error: sigma must be a scalar or have "
+                             "the same length as K".format(
+                                 _LIB_NAME, _OPTION_CHAIN_PRICE_N))
+    # check parameters and get tree height and time step
+    n, dt = _check_args(_OPTION_CHAIN_PRICE_N, S_, sigma, r, K, T_, q, d_dt,
+                        is_type, flavor)
+    # if method is not in _methods
+    if (method not in _methods):
+        raise ValueError("{0}.{1}: error: method can only be {2}".format(
+            _LIB_NAME, _OPTION_CHAIN_PRICE_N, _methods))
+    # boundary only makes sense for american options
+    if (boundary == True and flavor != "american"):
+        raise ValueError("{0}.{1}: error: boundary requires american flavor"
+                         "".format(_LIB_NAME, _OPTION_CHAIN_PRICE_N))
+    # closed-form fast path when the tree would just reproduce black-scholes
+    if (analytic == True and has_closed_form(r, q, is_type, flavor)):
+        prices = np.broadcast_to(_bsm(S_, K, sigma, r, q, n * dt, is_type),
+                                 K.shape).copy()
+        # never exercised early, so there is no boundary
+        if (boundary == True):
+            return prices, np.full((K.size, n + 1), np.nan)
+        return prices
+    # roll back all strikes at once
+    return _price_chain(S_, sigma, r, q, K, n, dt, is_type, flavor, method,
+                        cache = cache, boundary = boundary)
+
+def option_greeks(S_, sigma, r, K, T_, q = 0, d_dt = 1, is_type = "call",
+                  flavor = "european"):
+    """
+    prices an option and returns its delta, gamma and theta from the same
+    backward induction, instead of repricing with bumped inputs. the greeks are
+    read off of the option values at the first levels of the tree:
+
+    delta = (V_u - V_d) / (S_ * u - S_ * d)
+    gamma = ((V_uu - V_ud) / (S_uu - S_) - (V_ud - V_dd) / (S_ - S_dd))
+            / ((S_uu - S_dd) / 2)
+    theta = (V_ud - V_0) / (2 * dt)
+
+    where V_u, V_d are the values at level 1, V_uu, V_ud, V_dd the values at
+    level 2 (S_ud is S_ since d = 1 / u), and dt is the size of a time step.
+    requires a tree of height at least 2.
+
+    parameters are the same as for option_chain_price; K may be a scalar or
+    array_like, and sigma a scalar or array_like of per-strike vols.
+
+    returns Greeks namedtuple (price, delta, gamma, theta); theta is per year.
+    fields are floats if K is a scalar, else 1-D ndarrays in the order of K.
+    """
+    # remember if a single strike was passed
+    is_scalar = (np.ndim(K) == 0)
+    # flatten strikes to 1-D float array
+    K = np.asarray(K, dtype = float).ravel()
+    # if sigma is not a scalar, must have one vol per strike
+    if (np.ndim(sigma) != 0):
+        sigma = np.asarray(sigma, dtype = float).ravel()
+        if (sigma.size != K.size):
+            raise ValueError("{0}.{1}: error: sigma must be a scalar or have "
+                             "the same length as K".format(
+                                 _LIB_NAME, _OPTION_GREEKS_N))
+    # check parameters and get tree height and time step
+    n, dt = _check_args(_OPTION_GREEKS_N, S_, sigma, r, K, T_, q, d_dt,
+                        is_type, flavor)
+    # need two levels below the root
+    if (n < 2):
+        raise ValueError("{0}.{1}: error: tree must have at least 2 levels"
+                         "".format(_LIB_NAME, _OPTION_GREEKS_N))
+    # roll back, keeping levels 1 and 2
+    lat = _get_lattice(S_, sigma, r, q, n, dt)
+    v_0, v_1, v_2 = _numpy_rollback(lat, K, n, is_type, flavor, levels = True)
+    # underlying prices at levels 1 and 2 (ladder[..., n] is S_); flattened so
+    # per-strike vols give 1-D arrays
+    ladder = lat.ladder
+    s_d, s_u = np.ravel(ladder[..., n - 1]), np.ravel(ladder[..., n + 1])
+    s_dd, s_uu = np.ravel(ladder[..., n - 2]), np.ravel(ladder[..., n + 2])
+    # delta from level 1
+    delta = (v_1[:, 1] - v_1[:, 0]) / (s_u - s_d)
+    # gamma from level 2
+    gamma = ((v_2[:, 2] - v_2[:, 1]) / (s_uu - S_) -
+             (v_2[:, 1] - v_2[:, 0]) / (S_ - s_dd)) / (0.5 * (s_uu - s_dd))
+    # theta from the middle node of level 2, which is two steps later at S_
+    theta = (v_2[:, 1] - v_0) / (2 * dt)
+    # unwrap if scalar strike passed
+    if (is_scalar == True):
+        return Greeks(float(v_0[0]), float(delta[0]), float(gamma[0]),
+                      float(theta[0]))
+    return Greeks(v_0, delta, gamma, theta)
+
+def bsm_price(S_, sigma, r, K, T_, q = 0, is_type = "call"):
+    """
+    closed-form black-scholes-merton price of european options, vectorized over
+    strikes. this is also the price of an american call when q = 0 and r >= 0,
+    since such a call is never optimal to exercise early. used as the fast path
+    of option_price and option_chain_price.
+
+    parameters:
+
+    S_        price of underlying at time 0
+    sigma     constant underlying volatility of S; scalar or array_like of
+              per-strike vols with the same length as K
+    r         constant risk free rate
+    K         strike price, scalar or array_like of strike prices
+    T_        no. months until expiration; month/year standard is 30/360. need
+              not correspond to a whole number of days
+    q         optional constant dividend (or other) yield, default 0
+    is_type   "call", "put" (default "call")
+
+    returns the price as float if K and sigma are scalars, else 1-D ndarray of
+    prices in the same order as K
+    """
+    # cannot have negative underlying price, vol, strike, expiry, or yield
+    if (S_ < 0 or np.any(np.asarray(sigma) < 0) or np.any(np.asarray(K) < 0) or
+        T_ < 0 or q < 0):
+        raise ValueError("{0}.{1}: error: S_, sigma, K, T_ and q must be "
+                         "nonnegative".format(_LIB_NAME, _BSM_PRICE_N))
+    # if is_type is not in _option_types
+    if (is_type not in _option_types):
+        raise ValueError("{0}.{1}: error: option type can only be {2}".format(
+            _LIB_NAME, _BSM_PRICE_N, _option_types))
+    # scalar in, scalar out
+    if (np.ndim(K) == 0 and np.ndim(sigma) == 0):
+        return float(_bsm(S_, K, sigma, r, q, T_ / 12, is_type))
+    # flatten to 1-D
+    K = np.asarray(K, dtype = float).ravel()
+    if (np.ndim(sigma) != 0):
+        sigma = np.asarray(sigma, dtype = float).ravel()
+    return np.broadcast_to(_bsm(S_, K, sigma, r, q, T_ / 12, is_type),
+                           np.broadcast(K, sigma).shape).copy()
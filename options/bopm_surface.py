@@ -0,0 +1,174 @@
+"""
+prices grids of expiries x strikes x vol scenarios with the bopm module. each
+(expiry, vol scenario) pair is one chain, priced for all strikes at once with
+bopm.option_chain_price; the chains are sharded across a process pool so that
+large grids are not limited to a single core by the GIL. small grids are priced
+in process, since starting workers would cost more than the pricing itself.
+
+the prices can be returned as a DataFrame in the same layout as the
+data/spy_03-15-2019_bopm_*.csv files, i.e. a strike column followed by one
+column of bopm prices per vol scenario (and per expiry, if more than one).
+
+sample usage (reproduces data/spy_03-15-2019_bopm_puts.csv):
+
+>>> import pandas as pd
+>>> import options.bopm_surface as bs
+>>> puts = pd.read_csv("./data/spy_03-15-2019_puts.csv")
+>>> bs.price_surface(263.63, 0.03, puts.put_strike, 3,
+... {"ivol": puts.put_vol, "hvol": 0.22}, is_type = "put", df = True)
+"""
+# Changelog:
+#
+# 10-17-2026
+#
+# initial creation. added price_surface, which shards a grid of expiries x vol
+# scenarios over a concurrent.futures process pool with deterministic output
+# ordering, a chunk size heuristic, and in process fallback for small grids.
+
+from concurrent.futures import ProcessPoolExecutor
+import math
+import os
+import numpy as np
+import pandas as pd
+import options.bopm as bopm
+
+# library name
+_LIB_NAME = "bopm_surface"
+
+# function names
+_PRICE_SURFACE_N = "price_surface"
+
+# grids with less estimated work than this (in tree node updates) are priced in
+# process; starting a pool costs on the order of tens of milliseconds
+_MIN_PARALLEL_WORK = 20_000_000
+
+# target number of chunks per worker, so that uneven chunks still balance out
+_CHUNKS_PER_WORKER = 4
+
+def _price_task(task):
+    """
+    prices one (expiry, vol scenario) chain. task is a tuple of positional and
+    keyword arguments for bopm.option_chain_price. must be a module level
+    function so that it can be pickled and sent to worker processes.
+    """
+    args, kwargs = task
+    return bopm.option_chain_price(*args, **kwargs)
+
+def _chunk_size(n_tasks, workers):
+    """
+    heuristic chunk size for executor.map: split the tasks into about
+    _CHUNKS_PER_WORKER chunks per worker, which amortizes the cost of sending
+    tasks to the workers while leaving room to balance uneven chunks.
+    """
+    return max(1, math.ceil(n_tasks / (_CHUNKS_PER_WORKER * workers)))
+
+def price_surface(S_, r, K, T_s, sigmas, q = 0, d_dt = 1, is_type = "call",
+                  flavor = "american", method = "crr", analytic = True,
+                  max_workers = None, chunk_size = None,
+                  min_parallel_work = _MIN_PARALLEL_WORK, df = False):
+    """
+    prices a surface of expiries x vol scenarios x strikes. every (expiry, vol
+    scenario) pair is priced as one chain with bopm.option_chain_price; when the
+    estimated work is large enough, the chains are spread over a process pool.
+    results are always returned in grid order, regardless of which worker
+    priced which chain.
+
+    parameters:
+
+    S_                 price of underlying at time 0
+    r                  constant risk free rate
+    K                  array_like of strike prices
+    T_s                expiry or list of expiries, in months (see bopm)
+    sigmas             vol scenarios. either a dict mapping a label to a scalar
+                       vol or array_like of per-strike vols, or a list of these
+                       (labels are then "s0", "s1", ...). a single scalar vol is
+                       also accepted, with label "s0"
+    q                  optional constant dividend (or other) yield, default 0
+    d_dt               optional number of time steps per day, default 1
+    is_type            "call", "put" (default "call")
+    flavor             "american", "european" (default "american")
+    method             optional tree scheme, "crr" (default), "bbs" or "bbsr"
+    analytic           optional, default True; see bopm.option_chain_price
+    max_workers        optional max number of worker processes, default None
+                       (os.cpu_count()). set to 1 to always price in process
+    chunk_size         optional number of chains sent to a worker at a time,
+                       default None to use a heuristic
+    min_parallel_work  optional minimum estimated work, in tree node updates,
+                       before a process pool is used
+    df                 optional, default False. if True, return a DataFrame in
+                       the layout of the spy_03-15-2019_bopm_*.csv files
+
+    returns ndarray of shape (len(T_s), len(sigmas), len(K)) of option prices,
+    or a DataFrame with a "<is_type>_strike" column followed by one column
+    "bopm_<is_type>_<label>" per vol scenario if df is True. if there is more
+    than one expiry, the columns are "bopm_<is_type>_<label>_<T_>m" instead.
+    """
+    # flatten strikes; keep original dtype for the strike column of the frame
+    K_col = np.asarray(K).ravel()
+    K = K_col.astype(float)
+    # wrap single expiry in list
+    if (np.ndim(T_s) == 0):
+        T_s = [T_s]
+    T_s = list(T_s)
+    # normalize vol scenarios to lists of labels and vols
+    if (isinstance(sigmas, dict)):
+        labels = [str(e) for e in sigmas.keys()]
+        sigmas = list(sigmas.values())
+    else:
+        # a list may mix scalar vols and per-strike arrays, which np.ndim
+        # cannot take, so only other containers are checked for being a scalar
+        if (not isinstance(sigmas, (list, tuple)) and np.ndim(sigmas) == 0):
+            sigmas = [sigmas]
+        sigmas = list(sigmas)
+        labels = ["s{0}".format(i) for i in range(len(sigmas))]
+    # need at least one expiry and one vol scenario
+    if (len(T_s) == 0 or len(sigmas) == 0):
+        raise ValueError("{0}.{1}: error: need at least one expiry and one vol "
+                         "scenario".format(_LIB_NAME, _PRICE_SURFACE_N))
+    # per-strike vols are passed as arrays
+    sigmas = [e if np.ndim(e) == 0 else np.asarray(e, dtype = float).ravel()
+              for e in sigmas]
+    # max_workers must be positive if given
+    if (max_workers is not None and max_workers < 1):
+        raise ValueError("{0}.{1}: error: max_workers must be positive".format(
+            _LIB_NAME, _PRICE_SURFACE_N))
+    # one task per (expiry, vol scenario) pair, in row major grid order
+    kwargs = {"q": q, "d_dt": d_dt, "is_type": is_type, "flavor": flavor,
+              "method": method, "analytic": analytic}
+    tasks = [((S_, sigma, r, K, T_), kwargs) for T_ in T_s for sigma in sigmas]
+    # estimated work is k * n ** 2 / 2 node updates per tree-priced chain, and
+    # about k per closed-form chain
+    closed = (analytic == True and
+              bopm.has_closed_form(r, q, is_type, flavor))
+    work = 0
+    for T_ in T_s:
+        n = 30 * d_dt * T_
+        work += len(sigmas) * K.size * (1 if closed else n * n / 2)
+    # number of workers to use
+    workers = max_workers if max_workers is not None else (os.cpu_count() or 1)
+    workers = min(workers, len(tasks))
+    # price in process if the grid is small or only one worker is allowed
+    if (workers == 1 or work < min_parallel_work):
+        results = [_price_task(task) for task in tasks]
+    # else shard over a process pool; map preserves task order
+    else:
+        if (chunk_size is None):
+            chunk_size = _chunk_size(len(tasks), workers)
+        with ProcessPoolExecutor(max_workers = workers) as ex:
+            results = list(ex.map(_price_task, tasks, chunksize = chunk_size))
+    # stack into (expiry, vol scenario, strike) array
+    prices = np.array(results).reshape(len(T_s), len(sigmas), K.size)
+    # if df is False, return the array
+    if (df == False):
+        return prices
+    # else build frame in the layout of the bopm csv files
+    frame = pd.DataFrame({"{0}_strike".format(is_type): K_col})
+    for i, T_ in enumerate(T_s):
+        for j, label in enumerate(labels):
+            # only suffix with the expiry if there is more than one
+            if (len(T_s) == 1):
+                cn = "bopm_{0}_{1}".format(is_type, label)
+            else:
+                cn = "bopm_{0}_{1}_{2:g}m".format(is_type, label, T_)
+            frame[cn] = prices[i, j]
+    return frame
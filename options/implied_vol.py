@@ -0,0 +1,183 @@
+"""
+implied volatility solver for binomial tree option prices. backs out the vol
+that makes bopm reproduce a vector of market prices (for example the call_ask
+or put_ask columns of the spy chain files) for every strike of a chain at once.
+
+each iteration of the solver prices all unconverged contracts, plus a small vol
+bump for each of them to get vega, with a single call to
+bopm.option_chain_price, so a full chain solves in a few batched tree
+evaluations instead of hundreds of scalar reprices.
+"""
+# Changelog:
+#
+# 10-17-2026
+#
+# initial creation. added chain_implied_vol, a vectorized safeguarded newton/
+# bisection solver with warm starts from neighboring strikes and a per-contract
+# convergence mask.
+
+import math
+import numpy as np
+import options.bopm as bopm
+
+# library name
+_LIB_NAME = "implied_vol"
+
+# function names
+_CHAIN_IMPLIED_VOL_N = "chain_implied_vol"
+
+# relative size of the vol bump used for finite difference vega
+_VEGA_BUMP = 1e-5
+
+def _batch_price(sigmas, S_, r, K, T_, q, d_dt, is_type, flavor):
+    """
+    prices each (sigma, K) pair with a single cache-bypassing call to
+    bopm.option_chain_price. sigmas and K are 1-D arrays of the same length.
+    """
+    return bopm.option_chain_price(S_, sigmas, r, K, T_, q = q, d_dt = d_dt,
+                                   is_type = is_type, flavor = flavor,
+                                   cache = False)
+
+def _solve(prices, sigma, lo, hi, S_, r, K, T_, q, d_dt, is_type, flavor, tol,
+           max_iter):
+    """
+    safeguarded newton iteration for all contracts at once. [lo, hi] must
+    bracket the root for every contract. on each iteration, only contracts not
+    yet converged are priced; each gets a newton step using finite difference
+    vega, unless the step leaves the current bracket or vega is degenerate, in
+    which case the contract bisects instead. the bracket shrinks every step.
+
+    returns array of vols, with NaN where max_iter was reached before
+    convergence, and the number of batched tree evaluations used.
+    """
+    # copies, since brackets and guesses are updated in place
+    sigma, lo, hi = sigma.copy(), lo.copy(), hi.copy()
+    # convergence mask; True for contracts that are still being solved
+    active = np.ones(sigma.size, dtype = bool)
+    n_evals = 0
+    for _ in range(max_iter):
+        # indices of active contracts; stop if none are left
+        idx = np.flatnonzero(active)
+        if (idx.size == 0):
+            break
+        s = sigma[idx]
+        h = _VEGA_BUMP * np.maximum(s, 1)
+        # price at sigma and at sigma + h in one batched evaluation
+        pv = _batch_price(np.concatenate((s, s + h)), S_, r,
+                          np.tile(K[idx], 2), T_, q, d_dt, is_type, flavor)
+        n_evals += 1
+        f = pv[:idx.size] - prices[idx]
+        vega = (pv[idx.size:] - pv[:idx.size]) / h
+        # contracts within price tolerance are done
+        done = np.abs(f) < tol
+        # shrink brackets; price increases with vol
+        lo[idx] = np.where(f < 0, s, lo[idx])
+        hi[idx] = np.where(f > 0, s, hi[idx])
+        # newton step, falling back to bisection when it is not safe
+        with np.errstate(divide = "ignore", invalid = "ignore"):
+            s_new = s - f / vega
+        bad = ((vega <= 0) | ~np.isfinite(s_new) | (s_new <= lo[idx]) |
+               (s_new >= hi[idx]))
+        s_new[bad] = 0.5 * (lo[idx][bad] + hi[idx][bad])
+        # also done if the bracket has collapsed
+        done |= (hi[idx] - lo[idx]) < tol * 1e-3
+        sigma[idx] = np.where(done, s, s_new)
+        active[idx[done]] = False
+    # contracts that never converged have no reliable vol
+    sigma[active] = np.nan
+    return sigma, n_evals
+
+def chain_implied_vol(prices, S_, r, K, T_, q = 0, d_dt = 1, is_type = "call",
+                      flavor = "american", tol = 1e-6, max_iter = 50,
+                      sigma_lo = 1e-4, sigma_hi = 5.0):
+    """
+    solves for the implied volatility of every contract in an option chain at
+    once, such that bopm.option_price with that vol returns the given price.
+
+    the solver first checks that each price lies between the tree prices at
+    sigma_lo and sigma_hi. it then solves a thin, evenly spaced subset of the
+    strikes starting from the brenner-subrahmanyam at the money approximation,
+    and warm starts the remaining strikes by interpolating the vols of their
+    solved neighbors. both passes use a vectorized safeguarded newton/bisection
+    scheme that only reprices contracts that have not yet converged.
+
+    parameters:
+
+    prices    array_like of option prices (e.g. call_ask) to match
+    S_        price of underlying at time 0
+    r         constant risk free rate
+    K         array_like of strike prices, same length as prices
+    T_        no. months until expiration; month/year standard is 30/360
+    q         optional constant dividend (or other) yield, default 0
+    d_dt      optional number of time steps per day, default 1
+    is_type   "call", "put" (default "call")
+    flavor    "american", "european" (default "american"; spy options are
+              american style)
+    tol       optional absolute price tolerance, default 1e-6
+    max_iter  optional max number of iterations per pass, default 50
+    sigma_lo  optional lower bound for the vol, default 1e-4
+    sigma_hi  optional upper bound for the vol, default 5.0
+
+    returns 1-D ndarray of implied vols in the same order as K. contracts whose
+    price cannot be matched by any vol in [sigma_lo, sigma_hi], or that did not
+    converge, are NaN.
+    """
+    # flatten to 1-D float arrays
+    prices = np.asarray(prices, dtype = float).ravel()
+    K = np.asarray(K, dtype = float).ravel()
+    # prices and strikes must match up
+    if (prices.size != K.size):
+        raise ValueError("{0}.{1}: error: prices and K must have the same "
+                         "length".format(_LIB_NAME, _CHAIN_IMPLIED_VOL_N))
+    # bounds must be a valid bracket
+    if (sigma_lo <= 0 or sigma_hi <= sigma_lo):
+        raise ValueError("{0}.{1}: error: must have 0 < sigma_lo < sigma_hi"
+                         "".format(_LIB_NAME, _CHAIN_IMPLIED_VOL_N))
+    # tolerance and iterations must be positive
+    if (tol <= 0 or max_iter < 1):
+        raise ValueError("{0}.{1}: error: tol and max_iter must be positive"
+                         "".format(_LIB_NAME, _CHAIN_IMPLIED_VOL_N))
+    k = K.size
+    ivols = np.full(k, np.nan)
+    # empty chain
+    if (k == 0):
+        return ivols
+    # tree prices at both bounds, in one batched evaluation
+    pb = _batch_price(np.concatenate((np.full(k, sigma_lo),
+                                      np.full(k, sigma_hi))), S_, r,
+                      np.tile(K, 2), T_, q, d_dt, is_type, flavor)
+    # only prices inside the bracket (and not NaN) have a solution
+    ok = (prices >= pb[:k]) & (prices <= pb[k:])
+    idx = np.flatnonzero(ok)
+    if (idx.size == 0):
+        return ivols
+    # sort solvable contracts by strike for the neighbor warm starts
+    idx = idx[np.argsort(K[idx], kind = "stable")]
+    # pilot strikes: every stride-th strike, including both ends of the chain
+    stride = max(1, int(math.sqrt(idx.size)))
+    pilot = np.zeros(idx.size, dtype = bool)
+    pilot[::stride] = True
+    pilot[-1] = True
+    # first pass: pilot strikes from the at the money approximation
+    # sigma ~ sqrt(2 * pi / tau) * price / S, with tau in years
+    tau = T_ / 12
+    pi_ = idx[pilot]
+    s0 = np.sqrt(2 * math.pi / tau) * prices[pi_] / S_
+    s0 = np.clip(s0, sigma_lo, sigma_hi)
+    ivols[pi_], _ = _solve(prices[pi_], s0, np.full(pi_.size, sigma_lo),
+                           np.full(pi_.size, sigma_hi), S_, r, K[pi_], T_, q,
+                           d_dt, is_type, flavor, tol, max_iter)
+    # second pass: remaining strikes, warm started by interpolating the vols of
+    # the solved pilots on either side
+    rest = idx[~pilot]
+    if (rest.size > 0):
+        good = pi_[~np.isnan(ivols[pi_])]
+        # if no pilot converged, fall back to the middle of the bracket
+        if (good.size == 0):
+            s0 = np.full(rest.size, 0.5 * (sigma_lo + sigma_hi))
+        else:
+            s0 = np.interp(K[rest], K[good], ivols[good])
+        ivols[rest], _ = _solve(prices[rest], s0, np.full(rest.size, sigma_lo),
+                                np.full(rest.size, sigma_hi), S_, r, K[rest],
+                                T_, q, d_dt, is_type, flavor, tol, max_iter)
+    return ivols
@@ -0,0 +1,169 @@
+"""
+least-squares monte carlo (longstaff-schwartz) pricing of american options on
+simulated paths of the underlying, e.g. from stochastic_option.heston_paths with
+full = True. unlike bopm, the paths can come from any model, and discounting can
+use either a constant rate or simulated short rate paths (e.g. from
+rate_models/short_rate_1f).
+
+the backward induction is run for a whole vector of strikes at once. at every
+exercise date the in the money paths of every strike are regressed on a
+polynomial basis of moneyness S / K, with all the strikes' least squares problems
+solved in one batched call, and the exercise decisions of all strikes are made
+with a single masked array update.
+
+sample usage:
+
+>>> import options.stochastic_option as so
+>>> import options.lsm as lsm
+>>> S, _ = so.heston_paths(263.63, 0.22 ** 2, 0.03, 3, 2, 0.22 ** 2, 0.5,
+... -0.7, full = True, rng = 7)
+>>> lsm.lsm_price(S, [250, 260, 270], 3, 0.03, is_type = "put")
+"""
+# Changelog:
+#
+# 10-17-2026
+#
+# initial creation. added lsm_price, which prices american options for a
+# vector of strikes with batched per-date regressions and in the money masking.
+
+import math
+import numpy as np
+
+# library name
+_LIB_NAME = "lsm"
+
+# function names
+_LSM_PRICE_N = "lsm_price"
+
+# allowable option types
+_option_types = ["call", "put"]
+
+def _regress(x, y, mask, degree):
+    """
+    least squares fit of y on the polynomial basis 1, x, ..., x ** degree, over
+    the paths where mask is True, separately for every row (strike). x, y and
+    mask have shape (k, m). the normal equations of a polynomial basis only need
+    the power sums of x up to 2 * degree, so they are accumulated with (k, m)
+    array operations and solved as one batch of k small systems.
+
+    returns the fitted values of every path, shape (k, m).
+    """
+    d = degree + 1
+    # power sums sum(x ** l) and moments sum(x ** l * y) over the masked paths
+    pw = mask.astype(float)
+    p_sums = np.empty((x.shape[0], 2 * d - 1))
+    xy = np.empty((x.shape[0], d))
+    for l in range(2 * d - 1):
+        p_sums[:, l] = pw.sum(axis = 1)
+        if (l < d):
+            xy[:, l] = np.einsum("km,km->k", pw, y)
+        pw *= x
+    # normal equations a[k, i, j] = sum(x ** (i + j)), b[k, i] = sum(x ** i * y)
+    a = p_sums[:, np.add.outer(np.arange(d), np.arange(d))]
+    beta = np.matmul(np.linalg.pinv(a), xy[..., np.newaxis])[..., 0]
+    # evaluate the fitted polynomials with horner's rule
+    fit = np.repeat(beta[:, -1:], x.shape[1], axis = 1)
+    for i in range(d - 2, -1, -1):
+        fit *= x
+        fit += beta[:, i:i + 1]
+    return fit
+
+def _payoff(S, K, is_type):
+    """
+    exercise values of the prices S (shape (m,)) for every strike in K (shape
+    (k,)), shape (k, m).
+    """
+    if (is_type == "call"):
+        v = S - K[:, np.newaxis]
+    else:
+        v = K[:, np.newaxis] - S
+    return np.maximum(v, 0, out = v)
+
+def lsm_price(S, K, T_, r, is_type = "put", degree = 2, stderr = False):
+    """
+    prices american options with the longstaff-schwartz algorithm, for a vector
+    of strikes from one set of paths. exercise is allowed at every path point
+    after time 0 (and at time 0 itself, if immediate exercise is worth more).
+
+    parameters:
+
+    S        array_like of underlying paths, shape (n_paths, n + 1) with one
+             path per row starting at time 0, or a short_rate_1f.PathBlock
+    K        strike price, or array_like of strike prices
+    T_       no. months until expiration; month/year standard is 30/360. the n
+             steps of the paths are evenly spaced over T_
+    r        constant risk free rate, or array_like of short rate paths of the
+             same shape as S (or a PathBlock), used to discount each path along
+             its own rates with the trapezoidal rule
+    is_type  "call", "put" (default "put")
+    degree   optional degree of the polynomial regression basis, default 2
+    stderr   optional, default False. if True, also return standard errors
+             (which do not include the bias of the regression)
+
+    returns option price (float if K is scalar, else 1-D ndarray in the order
+    of K), or a tuple (price, standard error) if stderr is True.
+    """
+    # if is_type is not valid, raise ValueError
+    if (is_type not in _option_types):
+        raise ValueError("{0}.{1}: error: is_type must be one of {2}".format(
+            _LIB_NAME, _LSM_PRICE_N, _option_types))
+    # unwrap path blocks (anything with a to_numpy returning (x, y))
+    if (hasattr(S, "to_numpy") and not isinstance(S, np.ndarray)):
+        S = S.to_numpy()[1]
+    if (hasattr(r, "to_numpy") and not isinstance(r, np.ndarray)):
+        r = r.to_numpy()[1]
+    S = np.asarray(S, dtype = float)
+    # need at least one step after time 0
+    if (S.ndim != 2 or S.shape[1] < 2):
+        raise ValueError("{0}.{1}: error: S must have shape (n_paths, n + 1) "
+                         "with n >= 1".format(_LIB_NAME, _LSM_PRICE_N))
+    if (T_ <= 0 or degree < 1):
+        raise ValueError("{0}.{1}: error: T_ and degree must be positive"
+                         "".format(_LIB_NAME, _LSM_PRICE_N))
+    m, n = S.shape[0], S.shape[1] - 1
+    dt = T_ / 12 / n
+    # one step discount factors, shape (m, n) for rate paths or (n,) for a
+    # constant rate; column t discounts from t + 1 back to t
+    if (np.ndim(r) == 0):
+        disc = np.full(n, math.exp(-r * dt))
+    else:
+        r = np.asarray(r, dtype = float)
+        if (r.shape != S.shape):
+            raise ValueError("{0}.{1}: error: rate paths must have the same "
+                             "shape as S".format(_LIB_NAME, _LSM_PRICE_N))
+        disc = np.exp(-0.5 * dt * (r[:, :-1] + r[:, 1:]))
+    scalar = np.ndim(K) == 0
+    K = np.atleast_1d(np.asarray(K, dtype = float)).ravel()
+    # cash flows of every strike and path, valued at the current date; start
+    # with exercise at expiry
+    cf = _payoff(S[:, -1], K, is_type)
+    # backward induction over the exercise dates before expiry
+    for t in range(n - 1, 0, -1):
+        # discount cash flows from t + 1 back to t
+        cf *= disc[t] if disc.ndim == 1 else disc[:, t]
+        s_t = S[:, t]
+        ex = _payoff(s_t, K, is_type)
+        itm = ex > 0
+        # continuation values from a regression on moneyness S / K over the in
+        # the money paths
+        cont = _regress(s_t / K[:, np.newaxis], cf, itm, degree)
+        # strikes with too few in the money paths to fit are not exercised
+        fit = itm.sum(axis = 1) > degree + 1
+        exercise = itm & (ex > cont) & fit[:, np.newaxis]
+        np.copyto(cf, ex, where = exercise)
+    # discount from the first date back to time 0
+    cf *= disc[0] if disc.ndim == 1 else disc[:, 0]
+    price = cf.mean(axis = 1)
+    se = cf.std(axis = 1, ddof = 1) / math.sqrt(m) if m > 1 else \
+        np.full(K.size, np.nan)
+    # exercise at time 0 if it is worth more than holding
+    ex0 = _payoff(S[:1, 0], K, is_type)[:, 0]
+    now = ex0 > price
+    price = np.where(now, ex0, price)
+    se = np.where(now, 0, se)
+    # unwrap scalar strike
+    if (scalar):
+        price, se = price[0], se[0]
+    if (stderr):
+        return (price, se)
+    return price
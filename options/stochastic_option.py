@@ -0,0 +1,219 @@
+"""
+monte carlo option pricing with stochastic volatility (heston model). the
+underlying follows
+
+dS = (r - q) * S * dt + sqrt(v) * S * dW_1
+dv = kappa * (theta - v) * dt + xi * sqrt(v) * dW_2,  corr(dW_1, dW_2) = rho
+
+the variance v is a cir process, so it is stepped with the cir schemes of
+rate_models/short_rate_1f (by default andersen's quadratic-exponential scheme,
+which stays accurate at daily steps). given the variance at both ends of a step,
+log S is advanced with andersen's central discretization, which carries the
+correlation through the variance increment, so any variance scheme can be used.
+
+all paths are stepped together with whole array operations, and a european
+payoff is evaluated for a whole vector of strikes from the same terminal prices,
+so pricing an option chain costs a single simulation.
+
+sample usage:
+
+>>> import pandas as pd
+>>> import options.stochastic_option as so
+>>> calls = pd.read_csv("./data/spy_03-15-2019_calls.csv")
+>>> so.heston_price(263.63, 0.22 ** 2, 0.03, calls.call_strike, 3, 2, 0.22 ** 2,
+... 0.5, -0.7, rng = 7)
+"""
+# Changelog:
+#
+# 10-17-2026
+#
+# initial creation. added heston_paths and heston_price, a vectorized monte
+# carlo pricer for european options over a strike vector, with antithetic
+# variates and standard errors.
+
+import math
+import numpy as np
+import rate_models.short_rate_1f as sr1f
+
+# library name
+_LIB_NAME = "stochastic_option"
+
+# function names
+_HESTON_PATHS_N = "heston_paths"
+_HESTON_PRICE_N = "heston_price"
+
+# allowable option types
+_option_types = ["call", "put"]
+
+# max number of payoff matrix entries (paths x strikes) evaluated at a time
+_PAYOFF_BLOCK = 1 << 22
+
+def _check_heston(func_n, S_, v0, T_, kappa, theta, xi, rho, d_dt):
+    """
+    checks heston model parameters, raising ValueError on invalid ones, and
+    returns (n, dt), the number of time steps and the step size in years. T_ is
+    in months and d_dt in steps per day, as in bopm.
+    """
+    # underlying price must be positive
+    if (S_ <= 0):
+        raise ValueError("{0}.{1}: error: S_ must be positive".format(
+            _LIB_NAME, func_n))
+    # variance parameters must be positive (v0 may be 0)
+    if (v0 < 0 or kappa <= 0 or theta <= 0 or xi <= 0):
+        raise ValueError("{0}.{1}: error: need v0 >= 0 and kappa, theta, xi > "
+                         "0".format(_LIB_NAME, func_n))
+    # correlation must be a correlation
+    if (not (-1 <= rho <= 1)):
+        raise ValueError("{0}.{1}: error: rho must be in [-1, 1]".format(
+            _LIB_NAME, func_n))
+    # need at least one step
+    if (T_ <= 0 or d_dt < 1):
+        raise ValueError("{0}.{1}: error: T_ must be positive and d_dt at least "
+                         "1".format(_LIB_NAME, func_n))
+    # number of steps, month/year standard is 30/360
+    n = max(1, int(round(30 * d_dt * T_)))
+    return n, T_ / 12 / n
+
+def heston_paths(S_, v0, r, T_, kappa, theta, xi, rho, q = 0, d_dt = 1,
+                 n_paths = 100000, scheme = "qe", antithetic = True,
+                 rng = None, full = False):
+    """
+    simulates heston paths of the underlying and its variance, one time step at
+    a time for all paths at once.
+
+    parameters:
+
+    S_          price of underlying at time 0
+    v0          variance of underlying at time 0 (vol ** 2)
+    r           constant risk free rate
+    T_          no. months until expiration; month/year standard is 30/360
+    kappa       speed of mean reversion of the variance
+    theta       long run mean of the variance
+    xi          vol of the variance
+    rho         correlation between the underlying and variance shocks
+    q           optional constant dividend (or other) yield, default 0
+    d_dt        optional number of time steps per day, default 1
+    n_paths     optional number of paths, default 100000
+    scheme      optional cir scheme for the variance (see
+                short_rate_1f.return_cir_paths), default "qe"
+    antithetic  optional, default True. if True, the second half of the paths
+                use the negated normals of the first half; n_paths must be even
+    rng         optional random source, as in short_rate_1f.return_cir_paths
+    full        optional, default False. if True, return whole paths instead
+                of only the terminal values
+
+    returns tuple of ndarrays (S, v) of terminal prices and variances, of shape
+    (n_paths,), or of shape (n_paths, n + 1) if full is True.
+    """
+    n, dt = _check_heston(_HESTON_PATHS_N, S_, v0, T_, kappa, theta, xi, rho,
+                          d_dt)
+    # antithetic paths come in pairs
+    if (antithetic and n_paths % 2 != 0):
+        raise ValueError("{0}.{1}: error: n_paths must be even with antithetic "
+                         "variates".format(_LIB_NAME, _HESTON_PATHS_N))
+    rng = sr1f.get_rng(rng)
+    # variance step; v is a cir process with a = kappa, mu = theta, sigma = xi
+    step, needs_z, out = sr1f.cir_step(kappa, theta, dt, xi, scheme)
+    # coefficients of andersen's central discretization of log S, given the
+    # variance at the start (v) and end (v') of the step:
+    # ln S' = ln S + (r - q) dt + k0 + k1 v + k2 v' + sqrt(k3 v + k4 v') z
+    k0 = -rho * kappa * theta * dt / xi
+    k1 = 0.5 * dt * (kappa * rho / xi - 0.5) - rho / xi
+    k2 = 0.5 * dt * (kappa * rho / xi - 0.5) + rho / xi
+    k3 = 0.5 * dt * (1 - rho * rho)
+    drift = (r - q) * dt + k0
+    # half of the paths draw normals; the other half negates them
+    h = n_paths // 2 if antithetic else n_paths
+    def normals():
+        z = rng.standard_normal(size = h)
+        return np.concatenate((z, -z)) if antithetic else z
+    # states; x is the variance state, which "ft" lets go negative
+    x = np.full(n_paths, float(v0))
+    v = x if out is None else out(x)
+    ln_s = np.full(n_paths, math.log(S_))
+    if (full):
+        s_all = np.empty((n_paths, n + 1))
+        v_all = np.empty((n_paths, n + 1))
+        s_all[:, 0], v_all[:, 0] = S_, v
+    for i in range(1, n + 1):
+        # variance step, driven by its own normals
+        x = step(x, normals() if needs_z else None, rng)
+        v_new = x if out is None else out(x)
+        # log price step, with normals independent of the variance step
+        ln_s += (drift + k1 * v + k2 * v_new +
+                 np.sqrt(k3 * (v + v_new)) * normals())
+        v = v_new
+        if (full):
+            s_all[:, i], v_all[:, i] = np.exp(ln_s), v
+    if (full):
+        return (s_all, v_all)
+    return (np.exp(ln_s), v)
+
+def heston_price(S_, v0, r, K, T_, kappa, theta, xi, rho, q = 0, d_dt = 1,
+                 is_type = "call", n_paths = 100000, scheme = "qe",
+                 antithetic = True, rng = None, stderr = False):
+    """
+    prices european options under the heston model by monte carlo, for a whole
+    vector of strikes from one set of simulated paths (see heston_paths).
+
+    parameters:
+
+    S_          price of underlying at time 0
+    v0          variance of underlying at time 0 (vol ** 2)
+    r           constant risk free rate
+    K           strike price, or array_like of strike prices
+    T_          no. months until expiration; month/year standard is 30/360
+    kappa       speed of mean reversion of the variance
+    theta       long run mean of the variance
+    xi          vol of the variance
+    rho         correlation between the underlying and variance shocks
+    q           optional constant dividend (or other) yield, default 0
+    d_dt        optional number of time steps per day, default 1
+    is_type     "call", "put" (default "call")
+    n_paths     optional number of paths, default 100000
+    scheme      optional cir scheme for the variance, default "qe"
+    antithetic  optional, default True; pairs each path with its antithetic
+                path, and counts each pair as one sample
+    rng         optional random source, as in short_rate_1f.return_cir_paths
+    stderr      optional, default False. if True, also return standard errors
+
+    returns option price (float if K is scalar, else 1-D ndarray in the order
+    of K), or a tuple (price, standard error) if stderr is True.
+    """
+    # if is_type is not valid, raise ValueError
+    if (is_type not in _option_types):
+        raise ValueError("{0}.{1}: error: is_type must be one of {2}".format(
+            _LIB_NAME, _HESTON_PRICE_N, _option_types))
+    scalar = np.ndim(K) == 0
+    K = np.atleast_1d(np.asarray(K, dtype = float)).ravel()
+    s_t, _ = heston_paths(S_, v0, r, T_, kappa, theta, xi, rho, q = q,
+                          d_dt = d_dt, n_paths = n_paths, scheme = scheme,
+                          antithetic = antithetic, rng = rng)
+    # samples are antithetic pairs or single paths
+    m = n_paths // 2 if antithetic else n_paths
+    disc = math.exp(-r * T_ / 12)
+    price = np.empty(K.size)
+    se = np.empty(K.size)
+    # evaluate the payoff matrix (samples x strikes) a few strikes at a time
+    kb = max(1, _PAYOFF_BLOCK // max(n_paths, 1))
+    for j in range(0, K.size, kb):
+        k = K[j:j + kb]
+        # payoff of every path for every strike in the block
+        if (is_type == "call"):
+            pay = np.maximum(s_t[:, np.newaxis] - k, 0)
+        else:
+            pay = np.maximum(k - s_t[:, np.newaxis], 0)
+        # average antithetic pairs into single samples
+        if (antithetic):
+            pay = 0.5 * (pay[:m] + pay[m:])
+        price[j:j + kb] = pay.mean(axis = 0)
+        se[j:j + kb] = pay.std(axis = 0, ddof = 1) / math.sqrt(m) if m > 1 \
+            else np.nan
+    price *= disc
+    se *= disc
+    # unwrap scalar strike
+    if (scalar):
+        price, se = price[0], se[0]
+    if (stderr):
+        return (price, se)
+    return price
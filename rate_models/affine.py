@@ -0,0 +1,115 @@
+# closed form zero-coupon bond prices for the single-factor short rate models in
+# short_rate_1f. both models are affine: the price at time 0 of a zero-coupon bond
+# paying 1 at time tau, when the short rate is r, is
+#
+# P(r, tau) = A(tau) * exp(-B(tau) * r)
+#
+# vasicek:
+#
+# B = (1 - exp(-a * tau)) / a
+# A = exp((mu - sigma ** 2 / (2 * a ** 2)) * (B - tau) - sigma ** 2 * B ** 2 / (4 * a))
+#
+# cir, with h = sqrt(a ** 2 + 2 * sigma ** 2), d = (h + a) * (exp(h * tau) - 1) + 2 * h:
+#
+# B = 2 * (exp(h * tau) - 1) / d
+# A = (2 * h * exp((a + h) * tau / 2) / d) ** (2 * a * mu / sigma ** 2)
+#
+# a, mu, sigma are as in short_rate_1f, and tau is in the same time units as dt.
+# rates are used as they are, so rates quoted in percent (like the treasury yield
+# data files) must be divided by 100 first.
+#
+# Changelog:
+#
+# 10-17-2026
+#
+# initial creation. added bond_ab and bond_price. added yield_curve, which
+# evaluates yields for a grid of short rate levels x maturities at once.
+#
+
+# import pandas, numpy (assume both exist)
+import pandas as pd
+import numpy as np
+# import short_rate_1f
+import rate_models.short_rate_1f as sr1f
+
+# program name
+PROGNAME = "affine"
+
+# returns a tuple of ndarrays (log_A, B) for the model ("vas" or "cir") and the
+# time(s) to maturity tau (scalar or array_like, >= 0), such that the bond price is
+# exp(log_A - B * r). log A is returned instead of A, since it is what yields need,
+# and A itself underflows for long maturities
+def _bond_log_ab(model, a, mu, sigma, tau):
+    # if model is not in MODELS, raise ValueError
+    if (model not in sr1f.MODELS):
+        raise ValueError("{0}: error: model must be one of {1}".format(
+            PROGNAME, sr1f.MODELS))
+    # both closed forms need a positive speed of mean reversion
+    if (a <= 0):
+        raise ValueError("{0}: error: a must be positive".format(PROGNAME))
+    tau = np.asarray(tau, dtype = float)
+    # vasicek
+    if (model == "vas"):
+        b = -np.expm1(-a * tau) / a
+        log_a = ((mu - sigma * sigma / (2 * a * a)) * (b - tau) -
+                 sigma * sigma * b * b / (4 * a))
+        return (log_a, b)
+    # cir needs a positive vol
+    if (sigma <= 0):
+        raise ValueError("{0}: error: cir sigma must be positive".format(
+            PROGNAME))
+    h = np.sqrt(a * a + 2 * sigma * sigma)
+    e = np.expm1(h * tau)
+    d = (h + a) * e + 2 * h
+    b = 2 * e / d
+    log_a = (2 * a * mu / (sigma * sigma)) * (np.log(2 * h) + (a + h) * tau / 2 -
+                                             np.log(d))
+    return (log_a, b)
+
+# returns a tuple of ndarrays (A, B) of the affine bond price P = A * exp(-B * r) of
+# the model ("vas" or "cir") with parameters a, mu, sigma, for time(s) to maturity
+# tau (scalar or array_like, >= 0)
+def bond_ab(model, a, mu, sigma, tau):
+    log_a, b = _bond_log_ab(model, a, mu, sigma, tau)
+    return (np.exp(log_a), b)
+
+# returns the price(s) of zero-coupon bonds paying 1 at time(s) to maturity tau,
+# under the model ("vas" or "cir") with parameters a, mu, sigma and current short
+# rate r. r and tau may be scalars or arrays that broadcast together
+def bond_price(model, a, mu, sigma, r, tau):
+    log_a, b = _bond_log_ab(model, a, mu, sigma, tau)
+    return np.exp(log_a - b * np.asarray(r, dtype = float))
+
+# vectorized yield curve function for both cir and vasicek models
+# returns the continuously compounded zero-coupon yields -log(P(r, tau)) / tau of the
+# model ("vas" or "cir") for every short rate level in r and every maturity in tau,
+# in one broadcasted evaluation. params is the list [a, mu, dt, sigma, n] returned by
+# short_rate_1f.calibrate_model or calibrate_ols (dt and n are not used), so tau is
+# in the time units of that calibration. r may be a scalar or an array of any shape,
+# e.g. the (n_paths, n) states of simulated paths, and tau a scalar or 1-D array; the
+# result has shape r.shape + tau.shape. at tau = 0 the yield is its limit, r. if df
+# is True and r is 1-D, returns a DataFrame with one row per short rate level and one
+# column per maturity instead
+def yield_curve(model, params, r, tau, df = False):
+    a, mu, _, sigma, _ = params
+    r = np.asarray(r, dtype = float)
+    tau = np.asarray(tau, dtype = float)
+    # tau must be a single set of maturities
+    if (tau.ndim > 1):
+        raise ValueError("{0}: error: tau must be a scalar or 1-D".format(
+            PROGNAME))
+    log_a, b = _bond_log_ab(model, a, mu, sigma, tau)
+    # yields at tau > 0; the limit at tau = 0 is r itself
+    pos = tau > 0
+    t_safe = np.where(pos, tau, 1)
+    y = np.multiply.outer(r, b / t_safe) - log_a / t_safe
+    y = np.where(pos, y, r[..., np.newaxis] if tau.ndim == 1 else r)
+    # if df is True, wrap in dataframe (rows are short rate levels)
+    if (df == True):
+        # only a 1-D set of levels against a 1-D set of maturities is a table
+        if (r.ndim != 1 or tau.ndim != 1):
+            raise ValueError("{0}: error: df requires 1-D r and tau".format(
+                PROGNAME))
+        return pd.DataFrame(y, index = pd.Index(r, name = "r"),
+                            columns = pd.Index(tau, name = "tau"))
+    return y
@@ -0,0 +1,193 @@
+# monte carlo discount factors and zero-coupon bond prices on simulated short rate
+# paths of the models in short_rate_1f, with variance reduction:
+#
+# - antithetic variates: every normal draw z is also used as -z, and each pair of
+#   paths counts as one sample
+# - control variate: a shadow vasicek process with the same a and mu, driven by the
+#   same normals, whose bond prices are known in closed form (see affine). for a
+#   cir model the shadow vol is sigma * sqrt(mu), i.e. the cir vol at the mean
+#   level. the control coefficient is estimated per maturity by regression
+#
+# discount factors are exp(-integral of r), with the integral taken by the
+# trapezoidal rule over the time grid. every estimate comes with its standard
+# error.
+#
+# sample usage:
+#
+# >>> import rate_models.bond_mc as bmc
+# >>> res = bmc.mc_bond_price("cir", 0.5, 0.05, 1 / 12, 0.1, 121, 20000, rng = 7)
+# >>> res.price[-1], res.stderr[-1]   # 10 year zero, with its standard error
+#
+# Changelog:
+#
+# 10-17-2026
+#
+# initial creation. added discount_factors and mc_bond_price.
+#
+
+# import math
+import math
+# import namedtuple
+from collections import namedtuple
+# import numpy (assume it exists)
+import numpy as np
+# import short_rate_1f and affine
+import rate_models.short_rate_1f as sr1f
+import rate_models.affine as affine
+
+# program name
+PROGNAME = "bond_mc"
+
+# default number of paths simulated at a time
+BLOCK_SIZE = 10000
+
+# result of mc_bond_price: arrays over the time grid of the times to maturity, the
+# bond price estimates, and their standard errors, plus the number of paths used
+BondMC = namedtuple("BondMC", ["tau", "price", "stderr", "n_paths"])
+
+# returns the discount factors along simulated paths y (shape (n_paths, n), as
+# returned by short_rate_1f.return_cir_paths, return_vas_paths, or a path_store),
+# spaced dt apart. column k is exp(-integral of r from 0 to k * dt), with the
+# integral taken by the trapezoidal rule; column 0 is 1
+def discount_factors(y, dt):
+    y = np.asarray(y, dtype = float)
+    # trapezoidal rule, one step per column
+    steps = 0.5 * dt * (y[:, :-1] + y[:, 1:])
+    integral = np.zeros(y.shape)
+    np.cumsum(steps, axis = 1, out = integral[:, 1:])
+    return np.exp(-integral)
+
+# simulates one block of paths and returns (Y, C), the per-sample discount factors
+# of the model and of the shadow vasicek (None without control), of shape
+# (n, samples). with antithetic, each sample is the average of a pair of paths
+# driven by z and -z. step, needs_z, and out are as returned by short_rate_1f's
+# cir_step or vas_step
+def _block(step, needs_z, out, shadow, r_i, dt, n, samples, antithetic, rng):
+    # number of paths in the block
+    m = 2 * samples if antithetic else samples
+    # current states, rates, and integrals of the rates
+    x = np.full(m, r_i, dtype = float)
+    r = x if out is None else out(x)
+    integral = np.zeros(m)
+    d = np.empty((n, m))
+    d[0] = 1
+    # same for the shadow vasicek process
+    if (shadow is not None):
+        rv = r.copy()
+        integral_v = np.zeros(m)
+        dv = np.empty((n, m))
+        dv[0] = 1
+    for i in range(1, n):
+        # one row of normals per step; antithetic paths use the negated row
+        z = None
+        if (needs_z):
+            z = rng.standard_normal(size = samples)
+            if (antithetic):
+                z = np.concatenate((z, -z))
+        x = step(x, z, rng)
+        # trapezoidal rule for the integral of r
+        r_new = x if out is None else out(x)
+        integral += 0.5 * dt * (r + r_new)
+        r = r_new
+        d[i] = np.exp(-integral)
+        if (shadow is not None):
+            rv_new = shadow(rv, z, rng)
+            integral_v += 0.5 * dt * (rv + rv_new)
+            rv = rv_new
+            dv[i] = np.exp(-integral_v)
+    # average antithetic pairs into single samples
+    if (antithetic):
+        d = 0.5 * (d[:, :samples] + d[:, samples:])
+        if (shadow is not None):
+            dv = 0.5 * (dv[:, :samples] + dv[:, samples:])
+    return (d, dv if shadow is not None else None)
+
+# monte carlo zero-coupon bond pricing function for both cir and vasicek models
+# simulates n_paths paths of model ("cir" or "vas") with parameters as in
+# short_rate_1f.return_cir_paths / return_vas_paths (n points spaced dt apart,
+# starting at r_i, default mu), and estimates the price of a zero-coupon bond paying
+# 1 at every point of the time grid. rng is as in short_rate_1f.return_cir_paths.
+# paths are simulated block_size at a time, so memory stays bounded.
+#
+# antithetic   if True (default), pair every path with its antithetic path; n_paths
+#              must then be even
+# control      if True (default), use the shadow vasicek bond prices as a control
+#              variate
+#
+# both need a scheme driven by normal draws (not the "exact" cir scheme). returns a
+# BondMC of arrays over the time grid (tau = 0, dt, ..., (n - 1) * dt): price
+# estimates and their standard errors. note that the estimates include the time
+# discretization error of the scheme and of the trapezoidal rule, which the standard
+# error does not measure
+def mc_bond_price(model, a, mu, dt, sigma, n, n_paths, r_i = None,
+                  scheme = "euler", antithetic = True, control = True,
+                  rng = None, block_size = BLOCK_SIZE):
+    # get step function for the model and scheme
+    if (model == "cir"):
+        step, needs_z, out = sr1f.cir_step(a, mu, dt, sigma, scheme)
+        # shadow vasicek vol; cir vol at the mean level
+        sigma_v = sigma * math.sqrt(max(mu, 0))
+    elif (model == "vas"):
+        step, needs_z, out = sr1f.vas_step(a, mu, dt, sigma, scheme)
+        sigma_v = sigma
+    else:
+        raise ValueError("{0}: error: model must be one of {1}".format(
+            PROGNAME, sr1f.MODELS))
+    # antithetic and control variates both reuse the normal draws
+    if ((antithetic or control) and not needs_z):
+        raise ValueError("{0}: error: antithetic and control need a scheme "
+                         "driven by normals; {1} {2} is not".format(
+                             PROGNAME, model, scheme))
+    # antithetic paths come in pairs
+    if (antithetic and n_paths % 2 != 0):
+        raise ValueError("{0}: error: n_paths must be even with antithetic "
+                         "variates".format(PROGNAME))
+    # need at least 2 samples for a standard error
+    samples = n_paths // 2 if antithetic else n_paths
+    if (samples < 2):
+        raise ValueError("{0}: error: need at least 2 samples".format(PROGNAME))
+    # block size must be positive
+    if (block_size < 1):
+        raise ValueError("{0}: error: block_size must be positive".format(
+            PROGNAME))
+    # if r_i is None, set r_i to mu
+    if (r_i is None):
+        r_i = mu
+    rng = sr1f.get_rng(rng)
+    # shadow vasicek; exact gaussian step, so only the trapezoidal rule separates
+    # its expectation from the closed form
+    shadow = None
+    if (control):
+        shadow, _, _ = sr1f.vas_step(a, mu, dt, sigma_v, "exact")
+    # per maturity sums of Y, C, Y ** 2, C ** 2, Y * C over all samples
+    sy, sc, syy, scc, syc = [np.zeros(n) for _ in range(5)]
+    # samples per block; a pair of antithetic paths is one sample
+    per_block = max(1, block_size // 2) if antithetic else block_size
+    for start in range(0, samples, per_block):
+        k = min(per_block, samples - start)
+        y_, c_ = _block(step, needs_z, out, shadow, r_i, dt, n, k, antithetic,
+                        rng)
+        sy += y_.sum(axis = 1)
+        syy += np.einsum("ij,ij->i", y_, y_)
+        if (control):
+            sc += c_.sum(axis = 1)
+            scc += np.einsum("ij,ij->i", c_, c_)
+            syc += np.einsum("ij,ij->i", y_, c_)
+    # sample means and (unbiased) variances and covariance
+    m = samples
+    tau = dt * np.arange(n)
+    mean_y = sy / m
+    var_y = np.maximum(syy - m * mean_y * mean_y, 0) / (m - 1)
+    # plain (or antithetic) estimate
+    if (not control):
+        return BondMC(tau, mean_y, np.sqrt(var_y / m), n_paths)
+    mean_c = sc / m
+    var_c = np.maximum(scc - m * mean_c * mean_c, 0) / (m - 1)
+    cov = (syc - m * mean_y * mean_c) / (m - 1)
+    # control coefficient per maturity; 0 where the control does not vary (tau = 0)
+    beta = np.divide(cov, var_c, out = np.zeros(n), where = var_c > 0)
+    # closed form prices of the shadow vasicek bonds
+    p_c = affine.bond_price("vas", a, mu, sigma_v, r_i, tau)
+    price = mean_y - beta * (mean_c - p_c)
+    var = np.maximum(var_y - beta * cov, 0)
+    return BondMC(tau, price, np.sqrt(var / m), n_paths)
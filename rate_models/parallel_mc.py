@@ -0,0 +1,104 @@
+# reproducible parallel monte carlo for the single-factor short rate models in
+# short_rate_1f. the paths are split into fixed-size blocks, and each block gets
+# its own independent random stream, spawned from a master seed with
+# np.random.SeedSequence. the blocks are fanned out over a process pool, and
+# since the streams belong to the blocks and not to the workers, the paths are
+# bitwise identical no matter how many workers are used (including none).
+#
+# sample usage:
+#
+# >>> import rate_models.parallel_mc as pmc
+# >>> x, y = pmc.simulate("cir", 0.5, 0.05, 0.01, 0.1, 1000, 200000, seed = 7)
+#
+# Changelog:
+#
+# 10-17-2026
+#
+# initial creation. added simulate and block_seeds.
+#
+
+# import math and os
+import math
+import os
+# import process pool
+from concurrent.futures import ProcessPoolExecutor
+# import numpy (assume it exists)
+import numpy as np
+# import short_rate_1f
+import rate_models.short_rate_1f as sr1f
+
+# program name
+PROGNAME = "parallel_mc"
+
+# default number of paths per block (and per random stream). changing it changes
+# the paths, so it is part of what makes a run reproducible
+BLOCK_SIZE = 10000
+
+# simulations with fewer path steps than this are run in process; starting a pool
+# costs on the order of tens of milliseconds
+MIN_PARALLEL_WORK = 5000000
+
+# returns a list of independent np.random.SeedSequence objects, one per block of
+# block_size paths out of n_paths, spawned from the master seed
+def block_seeds(seed, n_paths, block_size = BLOCK_SIZE):
+    n_blocks = math.ceil(n_paths / block_size)
+    return np.random.SeedSequence(seed).spawn(n_blocks)
+
+# simulates one block of paths; task is a tuple (model, params, b, seed_seq),
+# where params is [a, mu, dt, sigma, n, r_i, scheme]. must be a module level
+# function so that it can be pickled and sent to worker processes
+def _block_task(task):
+    model, (a, mu, dt, sigma, n, r_i, scheme), b, ss = task
+    # pick the multi-path function for the model
+    if (model == "cir"):
+        return_paths = sr1f.return_cir_paths
+    else:
+        return_paths = sr1f.return_vas_paths
+    return return_paths(a, mu, dt, sigma, n, b, r_i = r_i, scheme = scheme,
+                        rng = np.random.default_rng(ss))[1]
+
+# simulates n_paths paths of model ("cir" or "vas") with parameters as in
+# short_rate_1f.return_cir_paths / return_vas_paths. the paths are simulated in
+# blocks of block_size paths, each driven by its own stream spawned from the
+# master seed (an int, or None for a fresh one), and the blocks are spread over
+# max_workers processes (default os.cpu_count()). if the total work is less than
+# min_parallel_work path steps, or only one worker is allowed, the blocks are
+# simulated in process. returns a tuple of ndarrays (x, y), where x is the time
+# axis and y has shape (n_paths, n); y is the same for any number of workers.
+def simulate(model, a, mu, dt, sigma, n, n_paths, seed = None, r_i = None,
+             scheme = "euler", block_size = BLOCK_SIZE, max_workers = None,
+             min_parallel_work = MIN_PARALLEL_WORK):
+    # if model is not in MODELS, raise ValueError
+    if (model not in sr1f.MODELS):
+        raise ValueError("{0}: error: model must be one of {1}".format(
+            PROGNAME, sr1f.MODELS))
+    # block size must be positive
+    if (block_size < 1):
+        raise ValueError("{0}: error: block_size must be positive".format(
+            PROGNAME))
+    # max_workers must be positive if given
+    if (max_workers is not None and max_workers < 1):
+        raise ValueError("{0}: error: max_workers must be positive".format(
+            PROGNAME))
+    # one task per block, each with its own seed sequence
+    params = [a, mu, dt, sigma, n, r_i, scheme]
+    tasks = []
+    for i, ss in enumerate(block_seeds(seed, n_paths, block_size)):
+        b = min(block_size, n_paths - i * block_size)
+        tasks.append((model, params, b, ss))
+    # number of workers to use
+    workers = max_workers if max_workers is not None else (os.cpu_count() or 1)
+    workers = min(workers, len(tasks))
+    # run in process if the simulation is small or only one worker is allowed
+    if (workers <= 1 or n * n_paths < min_parallel_work):
+        blocks = [_block_task(task) for task in tasks]
+    # else fan out over a process pool; map preserves block order
+    else:
+        with ProcessPoolExecutor(max_workers = workers) as ex:
+            blocks = list(ex.map(_block_task, tasks))
+    # np array for the x axis (time)
+    x = np.linspace(0, n - 1, n)
+    # stack the blocks in order
+    if (len(blocks) == 0):
+        return (x, np.empty((0, n)))
+    return (x, np.vstack(blocks))
@@ -0,0 +1,242 @@
+# streaming per time step statistics of simulated short rate paths, for when only
+# summaries are needed and not the paths themselves. a PathStats consumes blocks of
+# paths (from short_rate_1f.iter_paths, the multi-path functions, a PathBlock, or a
+# path_store) and keeps, for every time step:
+#
+# - count, mean, and sum of squared deviations, combined across blocks with chan's
+#   parallel update, plus the min and max
+# - a fixed-bin histogram between lo and hi (with underflow and overflow bins),
+#   which is a quantile sketch with resolution (hi - lo) / bins
+# - for every threshold, the number of paths that first cross it at that step
+#
+# memory is O(n * bins), independent of the number of paths. two PathStats built
+# with the same n, lo, hi, bins, and thresholds (e.g. by parallel workers) can be
+# combined with merge().
+#
+# sample usage:
+#
+# >>> import rate_models.short_rate_1f as sr1f
+# >>> import rate_models.path_stats as pst
+# >>> ps = pst.PathStats(1000, 0, 0.2, thresholds = [0.1])
+# >>> for block in sr1f.iter_paths("cir", 0.5, 0.05, 0.01, 0.1, 1000, 10 ** 6,
+# ... 10000, rng = 7):
+# ...     ps.update(block)
+# >>> ps.summary()
+#
+# Changelog:
+#
+# 10-17-2026
+#
+# initial creation. added PathStats and reduce_paths.
+#
+
+# import pandas, numpy (assume both exist)
+import pandas as pd
+import numpy as np
+# import short_rate_1f
+import rate_models.short_rate_1f as sr1f
+
+# program name
+PROGNAME = "path_stats"
+
+# default number of histogram bins per time step
+BINS = 200
+
+# default quantiles reported by summary()
+QUANTILES = [0.01, 0.05, 0.5, 0.95, 0.99]
+
+# streaming statistics of paths with n points each. lo and hi bound the histogram
+# bins used for quantiles (values outside still count, in the underflow and
+# overflow bins, but quantiles that fall there are only interpolated to the min or
+# max); thresholds is a list of levels whose first crossing times are counted
+class PathStats:
+
+    def __init__(self, n, lo, hi, bins = BINS, thresholds = ()):
+        # need a valid histogram range
+        if (not (hi > lo) or bins < 1):
+            raise ValueError("{0}: error: need lo < hi and bins >= 1".format(
+                PROGNAME))
+        self.n = n
+        self.lo = float(lo)
+        self.hi = float(hi)
+        self.bins = bins
+        self.thresholds = [float(e) for e in thresholds]
+        # per step moments
+        self.count = np.zeros(n, dtype = np.int64)
+        self.mean = np.zeros(n)
+        self.m2 = np.zeros(n)
+        self.min = np.full(n, np.inf)
+        self.max = np.full(n, -np.inf)
+        # per step histogram; column 0 is underflow, column bins + 1 overflow
+        self.hist = np.zeros((n, bins + 2), dtype = np.int64)
+        # per threshold, per step number of first crossings, and number of
+        # complete paths seen (the denominator of crossing probabilities)
+        self.hits = np.zeros((len(self.thresholds), n), dtype = np.int64)
+        self.n_paths = 0
+
+    # adds a block of paths. block is a PathBlock, a tuple (x, y) as returned by
+    # the multi-path functions and iter_paths, or a 2-D array y of complete paths.
+    # y has one path per row; x (the time axis, or a window of it) places the
+    # columns, so blocks of time steps from iter_paths(axis = "time") are
+    # accepted too. first crossings need complete paths, so thresholds can only be
+    # used with blocks that cover all n steps
+    def update(self, block):
+        # unpack into time axis and values
+        if (isinstance(block, sr1f.PathBlock)):
+            x, y = block.to_numpy()
+        elif (isinstance(block, tuple)):
+            x, y = block
+        else:
+            x, y = None, block
+        y = np.asarray(y, dtype = float)
+        if (y.ndim != 2):
+            raise ValueError("{0}: error: block must be 2-D (paths x steps)"
+                             "".format(PROGNAME))
+        b, w = y.shape
+        # first step covered by the block; x holds step indices
+        t0 = 0 if x is None or len(x) == 0 else int(round(x[0]))
+        if (t0 < 0 or t0 + w > self.n):
+            raise ValueError("{0}: error: block steps {1} to {2} out of range "
+                             "for n = {3}".format(PROGNAME, t0, t0 + w - 1,
+                                                  self.n))
+        # nothing to add
+        if (b == 0 or w == 0):
+            return self
+        s = slice(t0, t0 + w)
+        # block moments, merged with chan's parallel update
+        mean_b = y.mean(axis = 0)
+        m2_b = ((y - mean_b) ** 2).sum(axis = 0)
+        self._merge_moments(s, b, mean_b, m2_b)
+        np.minimum(self.min[s], y.min(axis = 0), out = self.min[s])
+        np.maximum(self.max[s], y.max(axis = 0), out = self.max[s])
+        # histogram; bin 0 is underflow, bins + 1 overflow
+        width = (self.hi - self.lo) / self.bins
+        idx = np.floor((y - self.lo) / width)
+        idx = np.clip(idx, -1, self.bins).astype(np.int64) + 1
+        # offset each step's bins so one bincount fills all of them
+        idx += np.arange(w) * (self.bins + 2)
+        self.hist[s] += np.bincount(idx.ravel(),
+                                    minlength = w * (self.bins + 2)).reshape(
+                                        w, self.bins + 2)
+        # first crossings
+        if (len(self.thresholds) > 0):
+            if (t0 != 0 or w != self.n):
+                raise ValueError("{0}: error: thresholds need blocks of "
+                                 "complete paths".format(PROGNAME))
+            for i, level in enumerate(self.thresholds):
+                side = np.sign(y - level)
+                # a path has crossed once it is on the level or on the other
+                # side of it from where it started
+                crossed = (side != side[:, :1]) | (side == 0)
+                hit = crossed.any(axis = 1)
+                first = np.argmax(crossed[hit], axis = 1)
+                self.hits[i] += np.bincount(first, minlength = self.n)
+            self.n_paths += b
+        elif (t0 == 0 and w == self.n):
+            self.n_paths += b
+        return self
+
+    # merges count b, means mean_b, and sums of squared deviations m2_b into the
+    # steps s with chan's parallel update
+    def _merge_moments(self, s, b, mean_b, m2_b):
+        n_a = self.count[s]
+        n = n_a + b
+        delta = mean_b - self.mean[s]
+        self.mean[s] += delta * b / n
+        self.m2[s] += m2_b + delta * delta * n_a * b / n
+        self.count[s] = n
+
+    # merges the statistics of other into this one, as if every block added to
+    # other had been added here. other must have the same n, lo, hi, bins, and
+    # thresholds. returns self
+    def merge(self, other):
+        if (self.n != other.n or self.lo != other.lo or self.hi != other.hi or
+            self.bins != other.bins or self.thresholds != other.thresholds):
+            raise ValueError("{0}: error: can only merge PathStats with the same "
+                             "n, lo, hi, bins, and thresholds".format(PROGNAME))
+        # chan's update works per step with varying counts; steps other has not
+        # seen are left alone
+        seen = other.count > 0
+        n_a, n_b = self.count[seen], other.count[seen]
+        n = n_a + n_b
+        delta = other.mean[seen] - self.mean[seen]
+        self.mean[seen] += delta * n_b / n
+        self.m2[seen] += other.m2[seen] + delta * delta * n_a * n_b / n
+        self.count[seen] = n
+        np.minimum(self.min, other.min, out = self.min)
+        np.maximum(self.max, other.max, out = self.max)
+        self.hist += other.hist
+        self.hits += other.hits
+        self.n_paths += other.n_paths
+        return self
+
+    # returns the per step (unbiased) variance; NaN where fewer than 2 values
+    def var(self):
+        with np.errstate(divide = "ignore", invalid = "ignore"):
+            return np.where(self.count > 1, self.m2 / (self.count - 1), np.nan)
+
+    # returns an array of shape (len(q), n) of the per step quantiles q (scalar or
+    # list in [0, 1]), interpolated linearly within histogram bins. the underflow
+    # and overflow bins span from the min to lo and from hi to the max
+    def quantiles(self, q = QUANTILES):
+        q = np.atleast_1d(np.asarray(q, dtype = float))
+        # bin edges per step: min, lo, ..., hi, max (bins + 3 edges)
+        inner = np.linspace(self.lo, self.hi, self.bins + 1)
+        lo_e = np.minimum(self.min, self.lo)[:, np.newaxis]
+        hi_e = np.maximum(self.max, self.hi)[:, np.newaxis]
+        edges = np.hstack((lo_e, np.broadcast_to(inner, (self.n, inner.size)),
+                           hi_e))
+        cdf = np.cumsum(self.hist, axis = 1)
+        rows = np.arange(self.n)
+        out = np.empty((q.size, self.n))
+        for i, qi in enumerate(q):
+            target = qi * self.count
+            # first bin whose cumulative count reaches the target
+            k = np.minimum((cdf < target[:, np.newaxis]).sum(axis = 1),
+                           self.bins + 1)
+            before = np.where(k > 0, cdf[rows, np.maximum(k - 1, 0)], 0)
+            in_bin = self.hist[rows, k]
+            with np.errstate(divide = "ignore", invalid = "ignore"):
+                frac = np.where(in_bin > 0, (target - before) / in_bin, 0)
+            left, right = edges[rows, k], edges[rows, k + 1]
+            v = left + np.clip(frac, 0, 1) * (right - left)
+            # quantiles never leave the observed range
+            v = np.clip(v, self.min, self.max)
+            out[i] = np.where(self.count > 0, v, np.nan)
+        return out
+
+    # returns an array of shape (len(thresholds), n) of the probability that a
+    # path has crossed each threshold by each step
+    def hit_prob(self):
+        if (self.n_paths == 0):
+            return np.full(self.hits.shape, np.nan)
+        return np.cumsum(self.hits, axis = 1) / self.n_paths
+
+    # returns a DataFrame indexed by the time axis (step indices, as in
+    # short_rate_1f) with columns count, mean, var, std, min, max, one column
+    # q<100 * q> per quantile in q, and one column p_hit_<level> per threshold.
+    # if df is False, returns a dict of the same columns as arrays
+    def summary(self, q = QUANTILES, df = True):
+        var = self.var()
+        cols = {"count": self.count, "mean": np.where(self.count > 0,
+                                                      self.mean, np.nan),
+                "var": var, "std": np.sqrt(var),
+                "min": np.where(self.count > 0, self.min, np.nan),
+                "max": np.where(self.count > 0, self.max, np.nan)}
+        for qi, v in zip(np.atleast_1d(q), self.quantiles(q)):
+            cols["q{0:g}".format(100 * qi)] = v
+        for level, p in zip(self.thresholds, self.hit_prob()):
+            cols["p_hit_{0:g}".format(level)] = p
+        # if df is False, return the dict of arrays
+        if (df == False):
+            return cols
+        return pd.DataFrame(cols, index = np.linspace(0, self.n - 1, self.n))
+
+# reduces an iterable of blocks (see PathStats.update) into a PathStats with the
+# given n, lo, hi, bins, and thresholds, e.g. reduce_paths(sr1f.iter_paths(...),
+# n, lo, hi). returns the PathStats
+def reduce_paths(blocks, n, lo, hi, bins = BINS, thresholds = ()):
+    ps = PathStats(n, lo, hi, bins = bins, thresholds = thresholds)
+    for block in blocks:
+        ps.update(block)
+    return ps
@@ -0,0 +1,139 @@
+# on-disk store for simulated short rate paths, so that a large simulation can be
+# run once and analyzed many times. a store is a .npy file holding an (n_paths, n)
+# float array, plus a small .json sidecar (same name, .json extension) recording
+# the model, its parameters, the seed, dt, and n. paths are written block by block
+# with short_rate_1f.iter_paths, so memory stays bounded while writing, and the
+# store is opened as a read-only memory map, so slicing paths or time windows only
+# reads the parts of the file that are touched.
+#
+# sample usage:
+#
+# >>> import rate_models.path_store as ps
+# >>> ps.write_store("cir.npy", "cir", 0.5, 0.05, 0.01, 0.1, 1000, 100000,
+# ... seed = 7)
+# >>> x, y, meta = ps.open_store("cir.npy")
+# >>> y[:10]            # first 10 paths, all steps
+# >>> y[:, 500:600]     # steps 500 to 599 of every path
+#
+# Changelog:
+#
+# 10-17-2026
+#
+# initial creation. added write_store, read_meta, open_store, read_paths, and
+# read_window.
+#
+
+# import json and os
+import json
+import os
+# import numpy (assume it exists)
+import numpy as np
+# import short_rate_1f
+import rate_models.short_rate_1f as sr1f
+
+# program name
+PROGNAME = "path_store"
+
+# store and sidecar extensions
+NPY_EXT = ".npy"
+JSON_EXT = ".json"
+
+# version of the sidecar layout
+STORE_VERSION = 1
+
+# default number of paths simulated and written at a time
+BLOCK_SIZE = 10000
+
+# returns the file name of the json sidecar of the store fname
+def meta_name(fname):
+    return os.path.splitext(fname)[0] + JSON_EXT
+
+# simulates n_paths paths of model ("cir" or "vas", see short_rate_1f.iter_paths)
+# and writes them to the store fname, which must be a .npy file. paths are
+# simulated and written block_size paths at a time. seed is an int seed for
+# np.random.default_rng; if None, a fresh seed is drawn and recorded so that the
+# store can always be regenerated. r_i and scheme are passed to iter_paths; dtype
+# is the dtype of the stored array, default float64. returns the metadata dict
+# written to the sidecar.
+def write_store(fname, model, a, mu, dt, sigma, n, n_paths, r_i = None,
+                scheme = "euler", seed = None, block_size = BLOCK_SIZE,
+                dtype = np.float64):
+    # store must be a .npy file
+    if (os.path.splitext(fname)[1] != NPY_EXT):
+        raise ValueError("{0}: error: store must be a {1} file".format(
+            PROGNAME, NPY_EXT))
+    # draw and record a seed if none was given
+    if (seed is None):
+        seed = np.random.SeedSequence().entropy
+    # if r_i is None, set r_i to mu (as iter_paths does) so that it is recorded
+    if (r_i is None):
+        r_i = mu
+    # metadata; everything needed to regenerate the paths
+    meta = {"version": STORE_VERSION, "model": model, "scheme": scheme,
+            "a": a, "mu": mu, "dt": dt, "sigma": sigma, "r_i": r_i, "n": n,
+            "n_paths": n_paths, "seed": seed, "block_size": block_size,
+            "dtype": np.dtype(dtype).name}
+    # iter_paths only checks its arguments once the first block is requested,
+    # so simulate the first block before creating the file; invalid arguments
+    # then leave nothing behind
+    blocks = sr1f.iter_paths(model, a, mu, dt, sigma, n, n_paths, block_size,
+                             r_i = r_i, scheme = scheme,
+                             rng = np.random.default_rng(seed))
+    first = next(blocks, None)
+    # preallocate the whole array on disk
+    y = np.lib.format.open_memmap(fname, mode = "w+", dtype = dtype,
+                                  shape = (n_paths, n))
+    # write each block of paths into its rows; a store that fails part way is
+    # removed, so that a .npy file without a sidecar is never left behind
+    try:
+        start = 0
+        while (first is not None):
+            block = first[1]
+            y[start:start + block.shape[0]] = block
+            start += block.shape[0]
+            first = next(blocks, None)
+        # flush to disk and release the map
+        y.flush()
+    except BaseException:
+        del y
+        os.remove(fname)
+        raise
+    del y
+    # write sidecar last, so a store with a sidecar is always complete
+    with open(meta_name(fname), "w") as f:
+        json.dump(meta, f, indent = 1)
+    return meta
+
+# returns the metadata dict of the store fname
+def read_meta(fname):
+    with open(meta_name(fname)) as f:
+        return json.load(f)
+
+# opens the store fname without reading it into memory. returns a tuple (x, y,
+# meta), where x is the time axis (as in short_rate_1f), y is a read-only memory
+# map of shape (n_paths, n), and meta is the metadata dict. slices of y are views
+# into the file; only the pages touched are read.
+def open_store(fname):
+    meta = read_meta(fname)
+    y = np.load(fname, mmap_mode = "r")
+    # sidecar and array must agree
+    if (y.shape != (meta["n_paths"], meta["n"])):
+        raise ValueError("{0}: error: shape of {1} does not match {2}".format(
+            PROGNAME, fname, meta_name(fname)))
+    # np array for the x axis (time)
+    x = np.linspace(0, meta["n"] - 1, meta["n"])
+    return (x, y, meta)
+
+# returns a tuple (x, y) of paths start to stop - 1 of the store fname, where y is
+# a read-only view of shape (stop - start, n). if stop is None, reads to the last
+# path.
+def read_paths(fname, start, stop = None):
+    x, y, _ = open_store(fname)
+    return (x, y[start:stop])
+
+# returns a tuple (x, y) of time steps t0 to t1 - 1 of every path of the store
+# fname, where x is that part of the time axis and y is a read-only view of shape
+# (n_paths, t1 - t0). if t1 is None, reads to the last step.
+def read_window(fname, t0, t1 = None):
+    x, y, _ = open_store(fname)
+    return (x[t0:t1], y[:, t0:t1])
@@ -0,0 +1,211 @@
+# rolling window calibration of the single-factor short rate models in
+# short_rate_1f. instead of recalibrating every window from scratch, a
+# RollingCalibrator keeps running statistics of the window that are updated in
+# O(1) when an observation enters or leaves it:
+#
+# - welford running mean and variance of the observed levels (the mu and sigma of
+#   short_rate_1f.calibrate_model)
+# - welford running means and co-moments of the pairs of consecutive observed
+#   values, which give the vasicek ar(1) fit of short_rate_1f.calibrate_ols
+# - running sums of the cir regression of short_rate_1f.calibrate_ols
+#
+# rolling_calibrate slides a window over a whole series in a single pass and
+# returns the parameters of every window.
+#
+# sample usage:
+#
+# >>> import pandas as pd
+# >>> import rate_models.rolling_calibration as rc
+# >>> df = pd.read_csv("./data/treasury_3m_yield_1981-2018.csv")
+# >>> rc.rolling_calibrate(df.DTB3, 250, model = "cir")
+#
+# Changelog:
+#
+# 10-17-2026
+#
+# initial creation. added RollingCalibrator and rolling_calibrate.
+#
+
+# import math
+import math
+# import pandas, numpy (assume both exist)
+import pandas as pd
+import numpy as np
+# import short_rate_1f
+import rate_models.short_rate_1f as sr1f
+
+# program name
+PROGNAME = "rolling_calibration"
+
+# running statistics of a window of a short rate series. observations enter with
+# add() and leave with remove(), both O(1); values that are NaN are ignored, and a
+# pair of consecutive values only counts if both are observed (and, for cir, the
+# first is positive). params() returns the current estimates.
+class RollingCalibrator:
+
+    # model is "vas" or "cir"; dt is the time step passed to the ar(1)/ols
+    # mappings of short_rate_1f
+    def __init__(self, model = "vas", dt = 1):
+        # if model is not in MODELS, raise ValueError
+        if (model not in sr1f.MODELS):
+            raise ValueError("{0}: error: model must be one of {1}".format(
+                PROGNAME, sr1f.MODELS))
+        self.model = model
+        self.dt = dt
+        # welford state of the levels: count, mean, sum of squared deviations
+        self.k = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        # welford state of the vasicek pairs: count, means, co-moments
+        self.m = 0
+        self.mx = 0.0
+        self.my = 0.0
+        self.cxx = 0.0
+        self.cxy = 0.0
+        self.cyy = 0.0
+        # running sums of the cir regression: count, sum(1 / r0), sum(r0),
+        # sum(y / sqrt(r0)), sum(y * sqrt(r0)), sum(y ** 2), where
+        # y = (r1 - r0) / sqrt(r0). plain sums, since the regression has no
+        # intercept to center
+        self.cir_sums = np.zeros(6)
+
+    # adds (sign = 1) or removes (sign = -1) the level x
+    def _level(self, x, sign):
+        # NaNs never enter the window statistics
+        if (math.isnan(x)):
+            return
+        if (sign > 0):
+            self.k += 1
+            d = x - self.mean
+            self.mean += d / self.k
+            self.m2 += d * (x - self.mean)
+            return
+        self.k -= 1
+        # window is empty; reset so rounding errors do not carry over
+        if (self.k == 0):
+            self.mean, self.m2 = 0.0, 0.0
+            return
+        d = x - self.mean
+        self.mean -= d / self.k
+        self.m2 -= d * (x - self.mean)
+
+    # adds (sign = 1) or removes (sign = -1) the pair of consecutive values (x, y)
+    def _pair(self, x, y, sign):
+        # pairs touching a NaN are never counted
+        if (math.isnan(x) or math.isnan(y)):
+            return
+        # vasicek pairs; the removal undoes the addition exactly
+        if (self.model == "vas"):
+            if (sign > 0):
+                self.m += 1
+                dx = x - self.mx
+                dy = y - self.my
+                self.mx += dx / self.m
+                self.my += dy / self.m
+                self.cxx += dx * (x - self.mx)
+                self.cxy += dx * (y - self.my)
+                self.cyy += dy * (y - self.my)
+                return
+            self.m -= 1
+            # no pairs left; reset so rounding errors do not carry over
+            if (self.m == 0):
+                self.mx = self.my = self.cxx = self.cxy = self.cyy = 0.0
+                return
+            dx = x - self.mx
+            dy = y - self.my
+            self.mx -= dx / self.m
+            self.my -= dy / self.m
+            self.cxx -= dx * (x - self.mx)
+            self.cxy -= (x - self.mx) * dy
+            self.cyy -= dy * (y - self.my)
+            return
+        # cir pairs need r0 > 0
+        if (x <= 0):
+            return
+        sq = math.sqrt(x)
+        z = (y - x) / sq
+        self.cir_sums += sign * np.array([1, 1 / x, x, z / sq, z * sq, z * z])
+        # no pairs left; reset so rounding errors do not carry over
+        if (self.cir_sums[0] == 0):
+            self.cir_sums[:] = 0
+
+    # adds the observation x to the window; prev is the observation just before x
+    # (NaN if there is none), which forms a pair with x
+    def add(self, x, prev = math.nan):
+        self._level(x, 1)
+        self._pair(prev, x, 1)
+
+    # removes the observation x from the window; nxt is the observation just after
+    # x (NaN if there is none), whose pair with x leaves the window as well
+    def remove(self, x, nxt = math.nan):
+        self._level(x, -1)
+        self._pair(x, nxt, -1)
+
+    # returns [a, mu, sigma, mean, std] for the current window, where a, mu, sigma
+    # are the estimates of short_rate_1f.calibrate_ols and mean, std are the sample
+    # mean and (population) stddev of the observed levels. estimates that cannot be
+    # made (too few pairs, or a window that is not mean reverting) are NaN
+    def params(self):
+        # level moments
+        mean = self.mean if self.k > 0 else math.nan
+        std = math.sqrt(max(self.m2, 0) / self.k) if self.k > 0 else math.nan
+        est = [math.nan] * 3
+        # vasicek ar(1) fit from the co-moments
+        if (self.model == "vas" and self.m >= 3 and self.cxx > 0):
+            b = self.cxy / self.cxx
+            c = self.my - b * self.mx
+            s2 = max(self.cyy - b * self.cxy, 0) / (self.m - 2)
+            try:
+                est = sr1f.vas_from_ar1(b, c, s2, self.dt)
+            except ValueError:
+                pass
+        # cir ols fit from the running sums
+        elif (self.model == "cir" and self.cir_sums[0] >= 3):
+            m, s11, s22, t1, t2, syy = self.cir_sums
+            det = s11 * s22 - m * m
+            if (det > 0):
+                b1 = (s22 * t1 - m * t2) / det
+                b2 = (s11 * t2 - m * t1) / det
+                s2 = max(syy - b1 * t1 - b2 * t2, 0) / (m - 2)
+                try:
+                    est = sr1f.cir_from_ols(b1, b2, s2, self.dt)
+                except ValueError:
+                    pass
+        return est + [mean, std]
+
+# slides a window of window observations over the series ts (pandas series or
+# ndarray; unparseable values are missing) one observation at a time, and returns
+# the parameters of every full window. dt follows the conventions of
+# short_rate_1f.calibrate_ols for a series of window elements, i.e. dt = dt_scale /
+# window. if df is True (default), returns a DataFrame indexed like the window end
+# points of ts, with columns a, mu, sigma, mean, std (see RollingCalibrator.params);
+# else returns an ndarray of shape (len(ts) - window + 1, 5)
+def rolling_calibrate(ts, window, model = "vas", dt_scale = 1, df = True):
+    # window must have room for at least one pair
+    if (window < 2):
+        raise ValueError("{0}: error: window must be at least 2".format(
+            PROGNAME))
+    # forcibly convert data to numeric data
+    r = np.asarray(pd.to_numeric(ts, errors = "coerce"), dtype = float)
+    n = r.size
+    rc = RollingCalibrator(model = model, dt = dt_scale / window)
+    out = np.empty((max(n - window + 1, 0), 5))
+    # a single pass: each step adds the newest observation and drops the oldest
+    for i in range(n):
+        rc.add(r[i], r[i - 1] if i > 0 else math.nan)
+        # drop the observation that just left the window, and its pair
+        if (i >= window):
+            rc.remove(r[i - window], r[i - window + 1])
+        # record every full window
+        if (i >= window - 1):
+            out[i - window + 1] = rc.params()
+    # if df is False, return the array
+    if (df == False):
+        return out
+    # else wrap in a dataframe indexed by the window end points
+    if (isinstance(ts, pd.Series)):
+        index = ts.index[window - 1:]
+    else:
+        index = np.arange(window - 1, n)
+    return pd.DataFrame(out, index = index,
+                        columns = ["a", "mu", "sigma", "mean", "std"])
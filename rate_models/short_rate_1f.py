@@ -5,6 +5,32 @@
 #
 # Changelog:
 #
+# 10-17-2026
+#
+# added return_cir_paths() and return_vas_paths(), which simulate many paths at
+# once and return an (n_paths, n) array. all normals are drawn in bulk, and every
+# path is advanced with one vectorized update per time step (including the cir
+# zero floor), instead of one python loop iteration per path per step.
+# added scheme parameter to the multi-path functions. "exact" samples the exact
+# transition distributions (gaussian for vasicek, scaled noncentral chi-square
+# for cir), so there is no discretization bias and dt can be as large as needed.
+# added iter_paths(), a generator that yields blocks of paths or blocks of time
+# steps across all paths with bounded memory, carrying the random state (and the
+# current rates) from block to block. the multi-path functions take an rng
+# parameter (seed or np.random.Generator); by default they still use np.random.
+# replaced the loop over the series in calibrate_model() with a vectorized
+# sign-change mask over the values on either side of mu (same results). added
+# calibrate_ols(), closed form least squares estimates of a, mu, sigma for both
+# models that skip missing values, including the "." of fred data files.
+# added PathBlock, a columnar container holding one shared time axis and a single
+# 2-D block of values, with views to numpy and pandas. the multi-path functions
+# and iter_paths take block (return PathBlocks) and dtype (e.g. np.float32).
+# added cir schemes "ft" (full truncation euler), "milstein", and "qe" (andersen's
+# quadratic-exponential), which stay accurate at much coarser dt than "euler".
+# the qe scheme's normal cdf comes from lib/special, shared with options/bopm.
+# made get_rng(), cir_step(), vas_step(), vas_from_ar1(), and cir_from_ols()
+# public, since bond_mc, rolling_calibration, and options/stochastic_option use them.
+#
 # 10-27-2018
 #
 # changed file name from cir.py to short_rate_1f.py, reflecting the file's intended
@@ -54,10 +80,24 @@
 import math
 import pandas as pd
 import numpy as np
+# import special, for the normal cdf of the qe scheme
+import lib.special as special
 
 # program name
 PROGNAME = "short_rate_1f"
 
+# simulation schemes accepted by return_cir_paths and return_vas_paths; "euler" is
+# the discretization used by return_cir and return_vas
+CIR_SCHEMES = ["euler", "ft", "milstein", "qe", "exact"]
+VAS_SCHEMES = ["euler", "exact"]
+
+# model names accepted by iter_paths
+MODELS = ["cir", "vas"]
+
+# block axes accepted by iter_paths; blocks of complete paths, or blocks of time
+# steps across all paths
+BLOCK_AXES = ["paths", "time"]
+
 # cir generating function
 # driven by sigma, with a to govern speed of mean reversion, while mu establishes the mean
 # dt is the differential timestep, and n is the number of times to loop
@@ -131,6 +171,348 @@ def return_vas(a, mu, dt, sigma, n, r_i = None, cc = 0, df = True):
     # else return ndarrays as a tuple
     return (x, y)
 
+# returns the random number source used by the multi-path functions. None uses the
+# global np.random state like return_cir and return_vas; an int seed or a
+# np.random.SeedSequence creates a new np.random.Generator, and a Generator is
+# used as is, so its state carries over from one call to the next
+def get_rng(rng):
+    # global state
+    if (rng is None):
+        return np.random
+    # already a generator
+    if (isinstance(rng, np.random.Generator)):
+        return rng
+    # else seed a new generator
+    return np.random.default_rng(rng)
+
+# switching level of psi = variance / mean ** 2 between the quadratic and exponential
+# branches of the qe scheme; andersen (2008) recommends 1.5
+QE_PSI_C = 1.5
+
+# returns (step, needs_z, out) for cir paths under the given scheme, where step(r, z,
+# rng) returns the state one step after r, needs_z is True if step expects z to be a
+# row of standard normals (one per path) drawn beforehand, and out is None if the
+# state is the rate, or else a function mapping the state to the rate (the "ft"
+# scheme carries a state that can go negative). see return_cir_paths for the schemes.
+# used to step paths outside this file, e.g. by bond_mc and stochastic_option:
+#
+# >>> step, needs_z, out = sr1f.cir_step(0.5, 0.05, 0.01, 0.1, "qe")
+# >>> r = step(r, rng.standard_normal(size = r.size) if needs_z else None, rng)
+def cir_step(a, mu, dt, sigma, scheme):
+    # if scheme is not in CIR_SCHEMES, raise ValueError
+    if (scheme not in CIR_SCHEMES):
+        raise ValueError("{0}: error: cir scheme must be one of {1}".format(
+            PROGNAME, CIR_SCHEMES))
+    # sqrt of dt; do not have to repeatedly call math.sqrt(dt)
+    dt_sqrt = math.sqrt(dt)
+    # euler step, flooring negative rates at 0
+    if (scheme == "euler"):
+        def step(r, z, rng):
+            # sqrt of r is safe since r is floored at 0
+            r = r + a * (mu - r) * dt + sigma * np.sqrt(r) * z * dt_sqrt
+            # cir processes cannot deal with negative rates; floor at 0
+            return np.maximum(r, 0, out = r)
+        return step, True, None
+    # full truncation euler; the state is never floored, only its positive part
+    # enters the drift and the diffusion, and the rate is the positive part
+    if (scheme == "ft"):
+        def step(x, z, rng):
+            xp = np.maximum(x, 0)
+            return x + a * (mu - xp) * dt + sigma * np.sqrt(xp) * z * dt_sqrt
+        return step, True, lambda x: np.maximum(x, 0)
+    # milstein step, written as a square plus a drift, floored at 0
+    if (scheme == "milstein"):
+        def step(r, z, rng):
+            r = ((np.sqrt(r) + 0.5 * sigma * dt_sqrt * z) ** 2 +
+                 (a * (mu - r) - 0.25 * sigma * sigma) * dt)
+            return np.maximum(r, 0, out = r)
+        return step, True, None
+    # exact and qe schemes need a positive speed, mean, and vol
+    if (a <= 0 or mu <= 0 or sigma <= 0):
+        raise ValueError("{0}: error: {1} cir scheme requires a, mu, sigma > 0"
+                         "".format(PROGNAME, scheme))
+    e_adt = math.exp(-a * dt)
+    # andersen's quadratic-exponential scheme; matches the first two moments of
+    # the exact transition with a squared gaussian (high rates) or a mixture of a
+    # point mass at 0 and an exponential (rates near 0)
+    if (scheme == "qe"):
+        # coefficients of the conditional mean and variance given r
+        v1 = sigma * sigma * e_adt * (1 - e_adt) / a
+        v0 = mu * sigma * sigma * (1 - e_adt) ** 2 / (2 * a)
+        def step(r, z, rng):
+            m = mu + (r - mu) * e_adt
+            psi = (r * v1 + v0) / (m * m)
+            # quadratic branch for every path: r' = m / (1 + b2) * (sqrt(b2) + z)
+            # ** 2. psi is capped so that paths on the other branch stay finite,
+            # which avoids masking the (usually much larger) quadratic branch
+            ip = 2 / np.minimum(psi, QE_PSI_C)
+            b2 = ip - 1 + np.sqrt(ip * (ip - 1))
+            out = m / (1 + b2) * (np.sqrt(b2) + z) ** 2
+            # exponential branch: 0 with probability p, else exponential. the
+            # uniform is u = N(z), so the normals alone drive every path
+            e = psi > QE_PSI_C
+            if (e.any()):
+                p = (psi[e] - 1) / (psi[e] + 1)
+                beta = (1 - p) / m[e]
+                # 1 - u = N(-z)
+                u_c = special.norm_cdf(-z[e])
+                with np.errstate(divide = "ignore"):
+                    out[e] = np.where(u_c >= 1 - p, 0,
+                                      np.log((1 - p) / u_c) / beta)
+            return out
+        return step, True, None
+    # constants of the transition distribution
+    c = sigma * sigma * (1 - e_adt) / (4 * a)
+    df = 4 * a * mu / (sigma * sigma)
+    def step(r, z, rng):
+        # noncentral chi-square draws are made per step, since the noncentrality
+        # depends on the current level of r
+        return c * rng.noncentral_chisquare(df, r * e_adt / c)
+    return step, False, None
+
+# returns (step, needs_z, out) for vasicek paths under the given scheme, in the same
+# way as cir_step (out is always None). both schemes are r = mu + (r - mu) *
+# decay + vol * z; see return_vas_paths for the schemes
+def vas_step(a, mu, dt, sigma, scheme):
+    # if scheme is not in VAS_SCHEMES, raise ValueError
+    if (scheme not in VAS_SCHEMES):
+        raise ValueError("{0}: error: vasicek scheme must be one of {1}".format(
+            PROGNAME, VAS_SCHEMES))
+    # euler: r += a * (mu - r) * dt + sigma * z * sqrt(dt)
+    if (scheme == "euler"):
+        decay = 1 - a * dt
+        vol = sigma * math.sqrt(dt)
+    # exact: mean reversion factor and stddev of the gaussian transition
+    else:
+        decay = math.exp(-a * dt)
+        # limit of the variance as a goes to 0 is sigma ** 2 * dt
+        if (a == 0):
+            vol = sigma * math.sqrt(dt)
+        else:
+            vol = sigma * math.sqrt((1 - decay * decay) / (2 * a))
+    def step(r, z, rng):
+        return mu + (r - mu) * decay + vol * z
+    return step, True, None
+
+# fills y (shape (n_paths, w)) with w successive values of every path, starting with
+# the current states r in column 0. the normals for all w - 1 steps are drawn in one
+# call. out is None, or maps states to the rates stored in y (see cir_step).
+# returns the states in the last column, so that a later block can continue from them
+def _fill_paths(y, r, step, needs_z, rng, out = None):
+    n_paths, w = y.shape
+    # nothing to fill
+    if (w == 0):
+        return r
+    # draw all w - 1 steps of normals for all paths at once; row i drives step i
+    if (needs_z):
+        z = rng.standard_normal(size = (w - 1, n_paths))
+    y[:, 0] = r if out is None else out(r)
+    for i in range(1, w):
+        r = step(r, z[i - 1] if needs_z else None, rng)
+        y[:, i] = r if out is None else out(r)
+    return r
+
+# columnar container for many paths that share one time axis
+# holds the time axis x (length n) once, and the values of all paths in a single
+# contiguous 2-D array y of shape (n_paths, n), one path per row, instead of one
+# dataframe (and one index) per path. model is the label prefix used for the
+# columns of to_frame, as in the cc labels of return_cir and return_vas. indexing a
+# PathBlock with an int, slice, or index array selects paths and returns a new
+# PathBlock (a view for ints and slices); window() selects time steps
+class PathBlock:
+
+    def __init__(self, x, y, model = "r"):
+        self.x = np.asarray(x)
+        self.y = np.asarray(y)
+        self.model = model
+        # time axis and values must line up
+        if (self.y.ndim != 2 or self.y.shape[1] != self.x.size):
+            raise ValueError("{0}: error: y must have shape (n_paths, {1})"
+                             "".format(PROGNAME, self.x.size))
+
+    # number of paths
+    @property
+    def n_paths(self):
+        return self.y.shape[0]
+
+    # number of points per path
+    @property
+    def n(self):
+        return self.y.shape[1]
+
+    # dtype of the values
+    @property
+    def dtype(self):
+        return self.y.dtype
+
+    # number of paths
+    def __len__(self):
+        return self.y.shape[0]
+
+    # selects paths; a single int still returns a block with one path. out of
+    # range ints raise IndexError, which also ends iteration over the paths
+    def __getitem__(self, idx):
+        if (isinstance(idx, (int, np.integer))):
+            if (not (-self.n_paths <= idx < self.n_paths)):
+                raise IndexError("{0}: error: path index {1} out of range for "
+                                 "{2} paths".format(PROGNAME, idx,
+                                                     self.n_paths))
+            idx = slice(idx, idx + 1 if idx != -1 else None)
+        return PathBlock(self.x, self.y[idx], model = self.model)
+
+    def __repr__(self):
+        return "PathBlock(model = {0!r}, n_paths = {1}, n = {2}, dtype = {3})" \
+            "".format(self.model, self.n_paths, self.n, self.dtype)
+
+    # returns a PathBlock of time steps t0 to t1 - 1 of every path (a view)
+    def window(self, t0, t1 = None):
+        return PathBlock(self.x[t0:t1], self.y[:, t0:t1], model = self.model)
+
+    # returns the tuple (x, y) of the multi-path functions; no copies are made
+    def to_numpy(self):
+        return (self.x, self.y)
+
+    # returns a DataFrame indexed by the time axis with one column per path,
+    # labeled model_i (the layout of return_cir and return_vas with df = True,
+    # side by side). the DataFrame wraps y without copying it
+    def to_frame(self):
+        cols = ["{0}_{1}".format(self.model, i) for i in range(self.n_paths)]
+        return pd.DataFrame(self.y.T, index = self.x, columns = cols,
+                            copy = False)
+
+# simulates n_paths paths with the given step function and out mapping (see
+# cir_step) into an array of dtype, and returns them as the tuple (x, y), or as a
+# PathBlock labeled model if block is True
+def _paths(step, needs_z, out, model, n, n_paths, r_i, rng, dtype, block):
+    # np array for the x axis (time)
+    x = np.linspace(0, n - 1, n)
+    # np array for the y axis (r), one row per path. the rates are always stepped
+    # in float64; dtype only sets how they are stored
+    y = np.empty((n_paths, n), dtype = dtype)
+    _fill_paths(y, np.full(n_paths, r_i, dtype = float), step, needs_z,
+                get_rng(rng), out)
+    # if block is True, wrap in a PathBlock
+    if (block == True):
+        return PathBlock(x, y, model = model)
+    # else return ndarrays as a tuple
+    return (x, y)
+
+# multi-path cir generating function
+# same model and parameters as return_cir, but simulates n_paths paths at once. all
+# the normals are drawn in one call, and each time step advances every path with a
+# single vectorized update. returns a tuple of ndarrays (x, y), where x is the time
+# axis of length n shared by all paths and y has shape (n_paths, n), one path per row.
+# rng is None to use the global np.random state, an int seed, or a np.random.Generator
+# (see get_rng). dtype is the dtype of y (e.g. np.float32 to halve its memory; the
+# rates are still stepped in float64), and if block is True, returns a PathBlock
+# instead of the tuple. scheme selects how each step is taken:
+#
+# "euler"     the euler step of return_cir, flooring negative rates at 0 (default).
+#             the floor biases the distribution unless dt is small
+# "ft"        full truncation euler: the state is never floored, but only its
+#             positive part enters the drift and diffusion, and the rate is the
+#             positive part of the state. much smaller bias than "euler"
+# "milstein"  milstein step, r(t + dt) = (sqrt(r) + sigma * sqrt(dt) * z / 2) ** 2 +
+#             (a * (mu - r) - sigma ** 2 / 4) * dt, floored at 0
+# "qe"        andersen's quadratic-exponential scheme, which matches the mean and
+#             variance of the exact transition: a scaled noncentral square of a
+#             gaussian when psi = var / mean ** 2 <= QE_PSI_C, else a point mass at 0
+#             mixed with an exponential. accurate at coarse dt, driven by normals
+#             only (so it works with antithetic variates), requires a, mu, sigma > 0
+# "exact"     samples the exact transition: r(t + dt) = c * X, where X is noncentral
+#             chi-square with 4 * a * mu / sigma ** 2 degrees of freedom and
+#             noncentrality r(t) * exp(-a * dt) / c, c = sigma ** 2 * (1 -
+#             exp(-a * dt)) / (4 * a). unbiased for any dt, so monthly or quarterly
+#             grids can be simulated directly. requires a, mu, sigma > 0
+def return_cir_paths(a, mu, dt, sigma, n, n_paths, r_i = None, scheme = "euler",
+                     rng = None, dtype = np.float64, block = False):
+    # get step function for the scheme
+    step, needs_z, out = cir_step(a, mu, dt, sigma, scheme)
+    # if r_i is None, set r_i to mu
+    if (r_i is None):
+        r_i = mu
+    return _paths(step, needs_z, out, "cir", n, n_paths, r_i, rng, dtype, block)
+
+# multi-path vasicek generating function
+# same model and parameters as return_vas, but simulates n_paths paths at once in the
+# same way as return_cir_paths. returns a tuple of ndarrays (x, y), where x is the
+# time axis of length n and y has shape (n_paths, n), one path per row. rng, dtype,
+# and block are as in return_cir_paths. scheme selects how each step is taken:
+#
+# "euler"   the euler step of return_vas (default)
+# "exact"   samples the exact gaussian transition: r(t + dt) = mu + (r(t) - mu) *
+#           exp(-a * dt) + sigma * sqrt((1 - exp(-2 * a * dt)) / (2 * a)) * z, which is
+#           unbiased for any dt. with a = 0 this is a random walk with vol sigma
+def return_vas_paths(a, mu, dt, sigma, n, n_paths, r_i = None, scheme = "euler",
+                     rng = None, dtype = np.float64, block = False):
+    # get step function for the scheme
+    step, needs_z, out = vas_step(a, mu, dt, sigma, scheme)
+    # if r_i is None, set r_i to mu
+    if (r_i is None):
+        r_i = mu
+    return _paths(step, needs_z, out, "vas", n, n_paths, r_i, rng, dtype, block)
+
+# chunked path generator for both cir and vasicek models
+# simulates paths of the same model and distribution as return_cir_paths or
+# return_vas_paths (model is "cir" or "vas"), but yields them in blocks so that
+# memory stays bounded no matter how many paths or steps are simulated. normals are
+# drawn per block, so for the same rng the paths only match those of
+# return_cir_paths or return_vas_paths when a single block covers them all. the
+# random number source is carried from one block to the next, so pass an int seed
+# or a np.random.Generator for reproducible runs.
+# with axis = "paths" (default), yields tuples (x, y) where x is the full time axis
+# and y holds block_size complete paths (shape (block_size, n); the last block may be
+# smaller). with axis = "time", yields tuples (x, y) where x is the next block_size
+# points of the time axis and y holds those steps for all n_paths paths (shape
+# (n_paths, block_size)); the current rates of every path carry over between blocks.
+# dtype and block are as in return_cir_paths; with block = True, yields PathBlocks.
+def iter_paths(model, a, mu, dt, sigma, n, n_paths, block_size, r_i = None,
+               scheme = "euler", axis = "paths", rng = None, dtype = np.float64,
+               block = False):
+    # get step function for the model and scheme
+    if (model == "cir"):
+        step, needs_z, out = cir_step(a, mu, dt, sigma, scheme)
+    elif (model == "vas"):
+        step, needs_z, out = vas_step(a, mu, dt, sigma, scheme)
+    else:
+        raise ValueError("{0}: error: model must be one of {1}".format(
+            PROGNAME, MODELS))
+    # if axis is not in BLOCK_AXES, raise ValueError
+    if (axis not in BLOCK_AXES):
+        raise ValueError("{0}: error: axis must be one of {1}".format(
+            PROGNAME, BLOCK_AXES))
+    # block size must be positive
+    if (block_size < 1):
+        raise ValueError("{0}: error: block_size must be positive".format(
+            PROGNAME))
+    # if r_i is None, set r_i to mu
+    if (r_i is None):
+        r_i = mu
+    rng = get_rng(rng)
+    # np array for the x axis (time)
+    x = np.linspace(0, n - 1, n)
+    # blocks of complete paths
+    if (axis == "paths"):
+        for start in range(0, n_paths, block_size):
+            b = min(block_size, n_paths - start)
+            y = np.empty((b, n), dtype = dtype)
+            _fill_paths(y, np.full(b, r_i, dtype = float), step, needs_z, rng,
+                        out)
+            yield PathBlock(x, y, model = model) if block else (x, y)
+        return
+    # else blocks of time steps across all paths; r holds the current rates
+    r = np.full(n_paths, r_i, dtype = float)
+    for start in range(0, n, block_size):
+        w = min(block_size, n - start)
+        # step from the last column of the previous block
+        if (start > 0):
+            z = rng.standard_normal(size = n_paths) if needs_z else None
+            r = step(r, z, rng)
+        y = np.empty((n_paths, w), dtype = dtype)
+        r = _fill_paths(y, r, step, needs_z, rng, out)
+        xw = x[start:start + w]
+        yield PathBlock(xw, y, model = model) if block else (xw, y)
+
 # calibrating function for both cir and vasicek models
 # given a time series (preferred is a pandas series or ndarray), assume process is normal
 # and then find the sample mean (mu), sample stddev (sigma), no. elements (n; can be
@@ -150,38 +532,127 @@ def calibrate_model(ts, dt_scale = 1, n_scale = 1):
     # calculate dt; by default dt is 1 / n (can multiply by dt_scale)
     dt = dt_scale / n
     # calcuate a: a = 1 / (sum(i = 0, j - 1: t_i)) * (j - 1), where t_i is the time to
-    # mean reversion for each interval of mean reversion
-    # number of intervals
-    j = 0
-    # number of units in interval
-    t_i = 0
-    # a (speed of mean reversion)
-    a = 0
-    # current level of rate
-    cr = ts[0]
-    # previous level of rate
-    pr = ts[0]
-    # for each element in ts, starting from first
-    for i in range(1, n):
-        # get current rate; can be np.nan
-        cr = ts[i]
-        # increment t_i
-        t_i += 1
-        # if the mean reversion interval has elapsed (cr cannot be NaN)
-        if (not math.isnan(cr) and ((cr < mu and pr > mu) or (cr > mu and pr < mu))):
-            # increment number of mean reversion intervals
-            j += 1
-            # add t_i to a
-            a += t_i
-            # reset t_i to 0
-            t_i = 0
-            # assign value of cr to pr
-            pr = cr
+    # mean reversion for each interval of mean reversion. the sum of the t_i is just
+    # the index of the last crossing of mu, so only the crossings are needed
+    j, a = _mean_crossings(np.asarray(ts, dtype = float), mu)
     # calculate a (use sample average to correct for sample, and decrease reversion speed)
     a = (j - 1) / a
     # return [a, mu, dt, sigma, n * n_scale] (n is scaled by n_scale)
     return [a, mu, dt, sigma, n * n_scale]
 
+# returns (j, t), where j is the number of times the series ts crosses mu and t is the
+# index of the last crossing (0 if there are none). a crossing is a value strictly on
+# the other side of mu from the value at the previous crossing (starting with ts[0]);
+# NaNs and values equal to mu never count. vectorized with a sign-change mask over the
+# signs of the values that can count, instead of walking the series
+def _mean_crossings(ts, mu):
+    # sign of each value relative to mu; NaNs become 0
+    s = np.sign(np.nan_to_num(ts - mu, nan = 0))
+    # if ts[0] is on neither side of mu, nothing ever crosses
+    if (ts.size == 0 or s[0] == 0):
+        return 0, 0
+    # indices of values on either side of mu; index 0 is always first
+    idx = np.flatnonzero(s)
+    # a crossing is a sign change between consecutive nonzero signs
+    cross = idx[1:][s[idx[1:]] != s[idx[:-1]]]
+    # no crossings
+    if (cross.size == 0):
+        return 0, 0
+    return cross.size, int(cross[-1])
+
+# returns the consecutive pairs (r0, r1) of the series ts where both values are
+# observed. values that cannot be converted to numbers (e.g. the "." used by fred for
+# missing values) are treated as NaN, and any pair touching a NaN is dropped
+def _ar1_pairs(ts):
+    r = np.asarray(pd.to_numeric(ts, errors = "coerce"), dtype = float)
+    r0, r1 = r[:-1], r[1:]
+    ok = ~(np.isnan(r0) | np.isnan(r1))
+    return r0[ok], r1[ok]
+
+# converts the ar(1) fit r1 = c + b * r0 + e, var(e) = s2, of a vasicek process
+# sampled every dt into [a, mu, sigma], using the exact transition of the process:
+# b = exp(-a * dt), c = mu * (1 - b), s2 = sigma ** 2 * (1 - b ** 2) / (2 * a)
+def vas_from_ar1(b, c, s2, dt):
+    # only 0 < b < 1 is a mean reverting process
+    if (not (0 < b < 1)):
+        raise ValueError("{0}: error: series is not mean reverting (ar(1) slope "
+                         "{1})".format(PROGNAME, b))
+    a = -math.log(b) / dt
+    mu = c / (1 - b)
+    sigma = math.sqrt(s2 * 2 * a / (1 - b * b))
+    return [a, mu, sigma]
+
+# converts the no-intercept regression (r1 - r0) / sqrt(r0) = b1 / sqrt(r0) + b2 *
+# sqrt(r0) + e, var(e) = s2, of a cir process sampled every dt into [a, mu, sigma],
+# using the euler step of the process: b1 = a * mu * dt, b2 = -a * dt, s2 = sigma **
+# 2 * dt
+def cir_from_ols(b1, b2, s2, dt):
+    # only b2 < 0 is a mean reverting process
+    if (not (b2 < 0)):
+        raise ValueError("{0}: error: series is not mean reverting (ols slope "
+                         "{1})".format(PROGNAME, b2))
+    a = -b2 / dt
+    mu = -b1 / b2
+    sigma = math.sqrt(s2 / dt)
+    return [a, mu, sigma]
+
+# closed form calibrating function for both cir and vasicek models
+# given a time series (pandas series or ndarray, where unparseable values and NaNs are
+# missing values), fits the model ("vas" or "cir") by ordinary least squares on the
+# pairs of consecutive observed values:
+#
+# vas   ar(1) regression r1 = c + b * r0 + e, mapped to a, mu, sigma through the
+#       exact gaussian transition (see return_vas_paths)
+# cir   regression of (r1 - r0) / sqrt(r0) on 1 / sqrt(r0) and sqrt(r0) with no
+#       intercept, mapped through the euler step (see return_cir); pairs with r0 <= 0
+#       are dropped
+#
+# the residual variance uses m - 2 degrees of freedom for m pairs. dt and n follow the
+# conventions of calibrate_model (dt = dt_scale / n, n = no. elements * n_scale), so
+# the two are interchangeable; returns list [a, mu, dt, sigma, n]
+def calibrate_ols(ts, model = "vas", dt_scale = 1, n_scale = 1):
+    # if model is not in MODELS, raise ValueError
+    if (model not in MODELS):
+        raise ValueError("{0}: error: model must be one of {1}".format(
+            PROGNAME, MODELS))
+    # total number of indices (also the n we will return)
+    n = len(ts)
+    # calculate dt; by default dt is 1 / n (can multiply by dt_scale)
+    dt = dt_scale / n
+    # pairs of consecutive observed values
+    r0, r1 = _ar1_pairs(ts)
+    # cir regression divides by sqrt(r0)
+    if (model == "cir"):
+        ok = r0 > 0
+        r0, r1 = r0[ok], r1[ok]
+    m = r0.size
+    # need more pairs than parameters to estimate the residual variance
+    if (m < 3):
+        raise ValueError("{0}: error: need at least 3 pairs of consecutive "
+                         "observations".format(PROGNAME))
+    # vasicek: centered ar(1) regression
+    if (model == "vas"):
+        x = r0 - r0.mean()
+        y = r1 - r1.mean()
+        b = np.dot(x, y) / np.dot(x, x)
+        c = r1.mean() - b * r0.mean()
+        e = y - b * x
+        a, mu, sigma = vas_from_ar1(b, c, np.dot(e, e) / (m - 2), dt)
+    # cir: solve the 2 x 2 normal equations directly
+    else:
+        sq = np.sqrt(r0)
+        y = (r1 - r0) / sq
+        # x'x = [[sum(1 / r0), m], [m, sum(r0)]], x'y = [t1, t2]
+        s11, s22 = np.sum(1 / r0), np.sum(r0)
+        t1, t2 = np.sum(y / sq), np.sum(y * sq)
+        det = s11 * s22 - m * m
+        b1 = (s22 * t1 - m * t2) / det
+        b2 = (s11 * t2 - m * t1) / det
+        e = y - b1 / sq - b2 * sq
+        a, mu, sigma = cir_from_ols(b1, b2, np.dot(e, e) / (m - 2), dt)
+    # return [a, mu, dt, sigma, n * n_scale] (n is scaled by n_scale)
+    return [a, mu, dt, sigma, n * n_scale]
+
 # main
 if (__name__ == "__main__"):
     print("{}: do not run in standalone mode.".format(PROGNAME))
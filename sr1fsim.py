@@ -4,6 +4,11 @@
 #
 # Changelog:
 #
+# 10-17-2026
+#
+# simulate all PR_N processes with one call to the multi-path functions in
+# short_rate_1f instead of one call per process.
+#
 # 12-22-2018
 #
 # made sure all the lines were 80 characters long or less, and reformatted the
@@ -238,21 +243,20 @@ if (__name__ == "__main__"):
     # determine which model to use; bind  appropriate function name to return_pr
     # if we have specified cir process
     if (MTYPE == CIR_N):
-        return_pr = sr1f.return_cir
+        return_pr = sr1f.return_cir_paths
     # else if we have specified vasicek model
     elif (MTYPE == VAS_N):
-        return_pr = sr1f.return_vas
+        return_pr = sr1f.return_vas_paths
 
     # create figure and plot processes
     # figure size width 12", height 9"
     fg = plt.figure(figsize = (12, 9))
+    # get x (t) and all PR_N paths of r at once; row i of ys is process i
+    x, ys = return_pr(*MODEL_PARAM, PR_N)
     # for PR_N iterations
     for i in range(PR_N):
-        # get x (t) and y (r) series of generated process; element 0 is time
-        # series, 1 is r
-        x, y = return_pr(*MODEL_PARAM, cc = i, df = False)
         # plot the series; label each as MTYPE + "_i"
-        plt.plot(x, y, label = "{0}_{1}".format(MTYPE, i))
+        plt.plot(x, ys[i], label = "{0}_{1}".format(MTYPE, i))
     # format after plotting
     # x label, y label (make vertical)
     plt.xlabel("t")